@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# Compares the row-major reservation map with the tiled (Morton ordered) one on the sample mixed cloud.
+# Generates the cloud, then times the fit tests each layout answers: windows around every reservation,
+# and maximizing every reservation.
+import argparse
+import os
+import time
+from itemcloud.box import Box
+from itemcloud.item_cloud import ItemCloud
+from itemcloud.logger.base_logger import BaseLogger
+from itemcloud.reservations import Reservations
+from itemcloud.size import Size, ResizeType
+from itemcloud.containers.base.item_factory import load_weighted_items
+from itemcloud.util.display_map import add_margin_to_display_map, can_fit_on_target
+from itemcloud.util.tiled_display_map import TiledDisplayMap
+
+def main() -> None:
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description='Benchmark the row-major and tiled reservation map layouts')
+    parser.add_argument('-i', default=os.path.join(script_dir, 'mixeditemcloud-import.csv'), help='weighted items csv')
+    parser.add_argument('-cloud_size', default='2814,705', help='width,height of the generated cloud')
+    parser.add_argument('-min_item_size', default='50,50', help='width,height of the smallest item')
+    parser.add_argument('-window_offsets', type=int, default=8, help='windows are slid up to this many cells each way')
+    parser.add_argument('-seed', type=int, default=1, help='seed of the generated cloud')
+    args = parser.parse_args()
+
+    logger = BaseLogger.create('benchmark_tiled_reservation_map', False)
+    os.chdir(os.path.dirname(os.path.abspath(args.i)))
+    item_cloud = ItemCloud(
+        logger=logger,
+        size=Size.parse(args.cloud_size),
+        min_item_size=Size.parse(args.min_item_size),
+        resize_type=ResizeType.MAINTAIN_ASPECT_RATIO,
+        seed=args.seed
+    )
+    layout = item_cloud.generate(load_weighted_items(args.i))
+    reservation_map = layout.canvas.reservation_map
+    tiled_map = TiledDisplayMap.from_display_map(reservation_map)
+    print(f'{len(layout.items)} items on {reservation_map.shape[1]}x{reservation_map.shape[0]}')
+
+    # every reservation's margined map, slid around its reservation
+    windows = list()
+    for layout_item in layout.items:
+        margin = layout_item.placement_box.get_margin(layout_item.reservation_box)
+        item_map = add_margin_to_display_map(layout_item.display_map, margin)
+        box = layout_item.reservation_box
+        for row_offset in range(-args.window_offsets, args.window_offsets + 1):
+            for col_offset in range(-args.window_offsets, args.window_offsets + 1):
+                window = Box(box.left + col_offset, box.upper + row_offset, box.right + col_offset, box.lower + row_offset)
+                if 0 <= window.left and 0 <= window.upper:
+                    windows.append((item_map, window, layout_item.reservation_no))
+
+    start = time.perf_counter()
+    row_major_fits = [can_fit_on_target(item_map, reservation_map, window, no) for item_map, window, no in windows]
+    row_major_latency = time.perf_counter() - start
+    start = time.perf_counter()
+    tiled_fits = [tiled_map.can_fit(item_map, window, no) for item_map, window, no in windows]
+    tiled_latency = time.perf_counter() - start
+    if row_major_fits != tiled_fits:
+        raise ValueError('tiled fit tests differ from row-major fit tests')
+    print(f'{len(windows)} windows ({sum(row_major_fits)} fit): row-major {row_major_latency:.3f}s, tiled {tiled_latency:.3f}s')
+
+    results = dict()
+    for tiled in (False, True):
+        reservations = Reservations.create_reservations(reservation_map.copy(), logger, tiled)
+        start = time.perf_counter()
+        results[tiled] = [
+            reservations.maximize_existing_reservation(
+                layout_item,
+                layout_item.placement_box.get_margin(layout_item.reservation_box),
+                layout.maximize_type
+            ).reservation_box.box_to_string()
+            for layout_item in layout.items
+        ]
+        print(f'maximizing {len(layout.items)} reservations: {"tiled" if tiled else "row-major"} {time.perf_counter() - start:.3f}s')
+    if results[False] != results[True]:
+        raise ValueError('tiled maximized reservations differ from row-major ones')
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ from typing import Dict, List, TextIO
 from itemcloud.cli_support.base import cli_helpers
 from itemcloud.containers.named_text import NamedText
 from itemcloud.util.fonts import pick_font
+from itemcloud.util.random import seed_random
 from itemcloud.containers.weighted_text import (
     WeightedText,
     WEIGHTED_TEXT_HEADERS,
@@ -57,6 +58,13 @@ def arguments() -> argparse.ArgumentParser:
         help='Optional, all output logging will also be written to this logfile'
         
     )
+    parser.add_argument(
+        '-seed',
+        metavar='<int>',
+        type=int,
+        default=None,
+        help='Optional, seeds the word and font picks so the same csv can be generated again (default: unseeded)'
+    )
     return parser
 
 def write_weighted_text(word_count_set: Dict[str,int], output_fd: TextIO) -> None:
@@ -66,9 +74,9 @@ def write_weighted_text(word_count_set: Dict[str,int], output_fd: TextIO) -> Non
     for word, weight in word_count_set.items():
         csv_writer.writerow(WeightedText(float(weight), NamedText(word, word, font, None, None)).to_csv_row())
 
-def generate_word_count_set(words: List[str], total_words: int) -> Dict[str, int]:
+def generate_word_count_set(words: List[str], total_words: int, seed: int | None = None) -> Dict[str, int]:
     result = {}
-    random.seed()
+    random.seed(seed)
     for _i in range(total_words):
         word = random.choice(words)
         if word in result:
@@ -85,8 +93,10 @@ def main() -> None:
         logger: BaseLogger = BaseLogger.create('generate weighted text', False)
     set_logger_instance(logger)
 
+    if args.seed is not None:
+        seed_random(args.seed)
     logger.info(f"Generate {args.count} random words from {len(args.words)} provided words.")
-    word_count_set = generate_word_count_set(args.words, args.count)
+    word_count_set = generate_word_count_set(args.words, args.count, args.seed)
 
     if args.output_filepath_csv:
         with open(args.output_filepath_csv, 'w') as fp:
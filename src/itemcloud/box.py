@@ -1,6 +1,7 @@
 from __future__ import annotations
 from enum import Enum
 from typing import List
+import numpy as np
 from itemcloud.size import Size
 from itemcloud.native.box import (
     native_create_box,
@@ -11,6 +12,15 @@ from itemcloud.native.box import (
     native_get_box_element
 )
 
+# boxes laid out as native Box structs, so native code reads them in place as a Box[::1]
+BOX_ARRAY_NP_DATA_TYPE = np.dtype([
+    ('left', np.int32),
+    ('upper', np.int32),
+    ('right', np.int32),
+    ('lower', np.int32)
+])
+BOX_ARRAY_TYPE = np.ndarray[BOX_ARRAY_NP_DATA_TYPE]
+
 class RotateDirection(Enum):
     COUNTERCLOCKWISE = -1
     CLOCKWISE = 1
@@ -222,4 +232,13 @@ def from_native_box_array(native_box_array) -> List[Box]:
     result: List[Box] = list()
     for i in range(native_box_array_length(native_box_array)):
         result.append(Box.from_native(native_get_box_element(native_box_array, i)))
-    return result
\ No newline at end of file
+    return result
+
+def to_box_array(lefts: np.ndarray, uppers: np.ndarray, size: Size) -> BOX_ARRAY_TYPE:
+    # boxes of size with their upper left corners at (lefts, uppers)
+    result = np.empty(len(lefts), dtype=BOX_ARRAY_NP_DATA_TYPE)
+    result['left'] = lefts
+    result['upper'] = uppers
+    result['right'] = result['left'] + size.width
+    result['lower'] = result['upper'] + size.height
+    return result
@@ -2,7 +2,9 @@ import argparse
 from typing import List
 from itemcloud.size import (
     Size,
-    RESIZE_TYPES
+    RESIZE_TYPES,
+    SizingType,
+    SIZING_TYPES
 )
 from itemcloud.item_cloud import ItemCloud
 from PIL import Image
@@ -46,6 +48,7 @@ class CLIBaseGenerateArguments(CLIBaseArguments):
         self.rotation_increment: int = self.parsed_args.rotation_increment
         self.resize_type: bool = self.parsed_args.resize_type
         self.maximize_type: bool = self.parsed_args.maximize_type
+        self.sizing_type: SizingType = self.parsed_args.sizing_type
         self.margin: int = self.parsed_args.margin
         self.opacity_pct: int = self.parsed_args.opacity_pct
         self.resize_resampling: Image.Resampling =Image.Resampling(self.parsed_args.resize_resampling)
@@ -53,6 +56,8 @@ class CLIBaseGenerateArguments(CLIBaseArguments):
         self.mode: str = self.parsed_args.mode
         self.cloud_expansion_step_size: int = self.parsed_args.cloud_expansion_step_size
         self.total_threads: int = self.parsed_args.total_threads
+        self.seed: int | None = self.parsed_args.seed
+        self.tiled_reservation_map: bool = self.parsed_args.tiled_reservation_map
 
     @staticmethod 
     def add_parser_arguments(
@@ -161,6 +166,14 @@ class CLIBaseGenerateArguments(CLIBaseArguments):
             help='Optional, (default %(default)s) {0}'.format(item_cloud_defaults.RESIZE_TYPE_HELP)
         )
 
+        parser.add_argument(
+            '-sizing_type',
+            default=item_cloud_defaults.DEFAULT_SIZING_TYPE,
+            metavar='{0}'.format('|'.join(SIZING_TYPES)),
+            type=lambda v: cli_helpers.is_sizing_type(parser, v),
+            help='Optional, (default %(default)s) {0}'.format(item_cloud_defaults.SIZING_TYPE_HELP)
+        )
+
         parser.add_argument(
             '-max_item_size',
             default=item_cloud_defaults.DEFAULT_MAX_ITEM_SIZE,
@@ -210,6 +223,25 @@ class CLIBaseGenerateArguments(CLIBaseArguments):
             type=lambda v: cli_helpers.is_integer(parser, v),
             help='Optional, (default $(default)s) {0}'.format(item_cloud_defaults.TOTAL_THREADS_HELP)
         )
+        parser.add_argument(
+            '-seed',
+            default=item_cloud_defaults.DEFAULT_SEED,
+            metavar='<int>',
+            type=lambda v: cli_helpers.is_integer(parser, v),
+            help='Optional, (default %(default)s) {0}'.format(item_cloud_defaults.SEED_HELP)
+        )
+        parser.add_argument(
+            '-tiled_reservation_map',
+            action='store_true',
+            help='Optional, {0}{1}'.format('(default) ' if item_cloud_defaults.DEFAULT_TILED_RESERVATION_MAP else '', item_cloud_defaults.TILED_RESERVATION_MAP_HELP)
+        )
+        parser.add_argument(
+            '-no-tiled_reservation_map',
+            action='store_false',
+            dest='tiled_reservation_map',
+            help='Optional, {0}fit tests read the row-major reservation map'.format('' if item_cloud_defaults.DEFAULT_TILED_RESERVATION_MAP else '(default) ')
+        )
+        parser.set_defaults(tiled_reservation_map=item_cloud_defaults.DEFAULT_TILED_RESERVATION_MAP)
 
 
 def create_item_cloud(args: CLIBaseGenerateArguments, item_cloud_type: ItemCloud) -> ItemCloud:
@@ -224,6 +256,7 @@ def create_item_cloud(args: CLIBaseGenerateArguments, item_cloud_type: ItemCloud
         item_rotation_increment=args.rotation_increment,
         resize_type=args.resize_type,
         maximize_type=args.maximize_type,
+        sizing_type=args.sizing_type,
         contour_width=args.contour_width,
         contour_color=args.contour_color,
         margin=args.margin,
@@ -231,5 +264,7 @@ def create_item_cloud(args: CLIBaseGenerateArguments, item_cloud_type: ItemCloud
         mode=args.mode,
         name=args.get_output_name(),
         total_threads=args.total_threads,
-        search_pattern=args.placement_search_pattern
+        search_pattern=args.placement_search_pattern,
+        seed=args.seed,
+        tiled_reservation_map=args.tiled_reservation_map
     )
@@ -60,6 +60,7 @@ def create_item_cloud(
         layout.item_rotation_increment,
         layout.resize_type,
         layout.maximize_type,
+        None,
         layout.scale,
         layout.contour.width,
         layout.contour.color,
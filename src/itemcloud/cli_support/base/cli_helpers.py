@@ -1,6 +1,6 @@
 import argparse
 import os.path
-from itemcloud.size import (Size, ResizeType, parse_to_resize_type)
+from itemcloud.size import (Size, ResizeType, parse_to_resize_type, SizingType, parse_to_sizing_type)
 from itemcloud.util.parsers import (
     parse_to_existing_path,
     parse_to_int,
@@ -63,4 +63,10 @@ def is_resize_type(parser: argparse.ArgumentParser, value: str) -> ResizeType:
     except Exception as e:
         parser.error(str(e))
 
+def is_sizing_type(parser: argparse.ArgumentParser, value: str) -> SizingType:
+    try:
+        return parse_to_sizing_type(value)
+    except Exception as e:
+        parser.error(str(e))
+
 
@@ -10,7 +10,9 @@ from itemcloud.containers.base.item import Item
 from itemcloud.box import Box, RotateDirection 
 from itemcloud.util.display_map import (
     DISPLAY_MAP_TYPE,
-    img_to_display_map
+    img_to_display_map,
+    rotate_display_map,
+    get_max_alpha_value_for_transparency
 )
 from itemcloud.size import Size
 from itemcloud.logger.base_logger import BaseLogger, get_logger_instance
@@ -70,6 +72,8 @@ class ImageItem(Item):
         self._image = image
         self._filepath = filepath
         self._display_map = None
+        # transparency threshold _display_map was made with
+        self._display_map_alpha: int | None = None
         self._rendered_image = image
 
     @property
@@ -82,10 +86,16 @@ class ImageItem(Item):
 
     @property
     def display_map(self) -> DISPLAY_MAP_TYPE:
-        if self._display_map is None:
+        max_alpha = get_max_alpha_value_for_transparency()
+        if self._display_map is None or self._display_map_alpha != max_alpha:
             self._display_map = img_to_display_map(self._rendered_image)
+            self._display_map_alpha = max_alpha
         return self._display_map
 
+    def _clear_display_map(self) -> None:
+        self._display_map = None
+        self._display_map_alpha = None
+
     @property
     def filepath(self) -> str:
         return self._filepath
@@ -188,12 +198,21 @@ class ImageItem(Item):
     
     def rotate_item(self, angle: float, direction: RotateDirection = RotateDirection.CLOCKWISE) -> Item:
         global g_rotate_resampling
-        result = self.rotate(angle=(angle if direction == RotateDirection.CLOCKWISE else -1.0 * angle), resample=g_rotate_resampling, expand=True)
+        degrees = angle if direction == RotateDirection.CLOCKWISE else -1.0 * angle
+        result = self.rotate(angle=degrees, resample=g_rotate_resampling, expand=True)
+        if 0 == (degrees % 90) and self._display_map is not None and self._display_map_alpha == get_max_alpha_value_for_transparency():
+            # right angles only move pixels, so the map rotates with them rather than being thresholded again
+            result._display_map = rotate_display_map(self._display_map, degrees)
+            result._display_map_alpha = self._display_map_alpha
         return result
 
 
     def copy_item(self) -> Item:
-        return ImageItem(self._image, extend_filename(self.filepath, '-copy'))
+        result = ImageItem(self._image, extend_filename(self.filepath, '-copy'))
+        # same image, so the same map
+        result._display_map = self._display_map
+        result._display_map_alpha = self._display_map_alpha
+        return result
 
     def convert(
         self,
@@ -217,6 +236,7 @@ class ImageItem(Item):
         rawmode: str = "RGB",
     ) -> None:
         self._image.putpalette(data, rawmode)
+        self._clear_display_map()
 
     def filter(
             self,
@@ -250,6 +270,7 @@ class ImageItem(Item):
             None if box is None else box if isinstance(box, tuple) else box._image,
             None if mask is None else mask._image
         )
+        self._clear_display_map()
 
     def save(
         self,
@@ -265,6 +286,7 @@ class ImageItem(Item):
     
     def alpha_composite(self, im: ImageItem, dest: Sequence[int] = (0, 0), source: Sequence[int] = (0, 0)) -> None:
         self._image.alpha_composite(im=im._image, dest=dest, source=source)
+        self._clear_display_map()
 
     @staticmethod
     def new_alpha_composite(im1: ImageItem, im2: ImageItem) -> ImageItem:
@@ -0,0 +1,120 @@
+from __future__ import annotations
+from typing import Any, Dict
+from itemcloud.containers.base.item import Item
+from itemcloud.containers.base.item_types import ItemType
+from itemcloud.box import RotateDirection
+from itemcloud.size import Size
+from itemcloud.logger.base_logger import BaseLogger
+from itemcloud.util.display_map import (
+    DISPLAY_MAP_TYPE,
+    resize_display_map,
+    rotate_display_map
+)
+
+class PlacementItem(Item):
+    # Stands in for source resized to size and then rotated clockwise by rotated_degrees while searching for a
+    # placement. Its display map is resampled from source's, so nothing is rendered until materialize().
+    def __init__(self, source: Item, size: Size | None = None, rotated_degrees: float = 0) -> None:
+        self._source = source
+        self._size = size if size is not None else source.item_size
+        self._rotated_degrees = rotated_degrees
+        self._display_map: DISPLAY_MAP_TYPE | None = None
+        self._materialized_item: Item | None = None
+        # rotations of this (unrotated) item by clockwise degrees, so a rotation cycle builds each mask once
+        self._rotated_items: Dict[float, PlacementItem] = dict()
+
+    @property
+    def source(self) -> Item:
+        return self._source
+
+    @property
+    def rotated_degrees(self) -> float:
+        return self._rotated_degrees
+
+    @property
+    def type(self) -> ItemType:
+        return self._source.type
+
+    @property
+    def display_map(self) -> DISPLAY_MAP_TYPE:
+        if self._display_map is None:
+            display_map = self._source.display_map
+            if not(self._size.is_equal(self._source.item_size)):
+                display_map = resize_display_map(display_map, self._size)
+            if 0 != self._rotated_degrees:
+                display_map = rotate_display_map(display_map, self._rotated_degrees)
+            self._display_map = display_map
+        return self._display_map
+
+    @property
+    def width(self) -> int:
+        if 0 == self._rotated_degrees:
+            return self._size.width
+        return self.display_map.shape[1]
+
+    @property
+    def height(self) -> int:
+        if 0 == self._rotated_degrees:
+            return self._size.height
+        return self.display_map.shape[0]
+
+    def resize_item(self, size: Size) -> Item:
+        if 0 != self._rotated_degrees:
+            return self.materialize().resize_item(size)
+        if self._size.is_equal(size):
+            return self
+        return PlacementItem(self._source, size)
+
+    def rotate_item(self, angle: float, direction: RotateDirection = RotateDirection.CLOCKWISE) -> Item:
+        # only images rotate as their masks do, text is rendered rotated into the same size
+        if 0 != self._rotated_degrees or ItemType.IMAGE != self.type:
+            return self.materialize().rotate_item(angle, direction)
+        degrees = angle if RotateDirection.CLOCKWISE == direction else -angle
+        if 0 == degrees:
+            return self
+        result = self._rotated_items.get(degrees)
+        if result is None:
+            result = PlacementItem(self._source, self._size, degrees)
+            self._rotated_items[degrees] = result
+        return result
+
+    def materialize(self) -> Item:
+        # the item this stands in for, rendered once
+        if self._materialized_item is None:
+            result = self._source
+            if not(self._size.is_equal(result.item_size)):
+                result = result.resize_item(self._size)
+            if 0 != self._rotated_degrees:
+                result = result.rotate_item(self._rotated_degrees, RotateDirection.CLOCKWISE)
+            self._materialized_item = result
+        return self._materialized_item
+
+    def to_image(
+        self,
+        rotated_degrees: int | None = None,
+        size: Size | None = None,
+        logger: BaseLogger | None = None,
+        as_watermark: bool = False
+    ) -> "ImageItem":
+        return self.materialize().to_image(rotated_degrees, size, logger, as_watermark)
+
+    def show(self, title: str | None = None) -> None:
+        self.materialize().show(title)
+
+    def copy_item(self) -> Item:
+        return PlacementItem(self._source, self._size, self._rotated_degrees)
+
+    def to_csv_row(self, directory: str = '.') -> Dict[str, Any]:
+        return self.materialize().to_csv_row(directory)
+
+    def to_write_item_filename(self, directory: str, name: str) -> str:
+        return self.materialize().to_write_item_filename(directory, name)
+
+    def write_row(self, directory: str, name: str, row: Dict[str, Any]) -> str:
+        return self.materialize().write_row(directory, name, row)
+
+def to_placement_item(item: Item) -> PlacementItem:
+    return item if isinstance(item, PlacementItem) else PlacementItem(item)
+
+def to_materialized_item(item: Item) -> Item:
+    return item.materialize() if isinstance(item, PlacementItem) else item
@@ -9,6 +9,7 @@ from itemcloud.containers.base.item_factory import create_layout_item, create_we
 from itemcloud.containers.base.item import Item
 from itemcloud.containers.base.item_types import ITEM_WEIGHT
 from itemcloud.containers.base.named_item import NamedItem
+from itemcloud.containers.base.placement_item import to_placement_item
 from itemcloud.layout.base.layout_item import LayoutItem
 from itemcloud.box import Box
 from itemcloud.box import RotateDirection
@@ -111,7 +112,8 @@ def resize_items_to_proportionally_fit(
         item_size = witem.item_size
         target_area = witem.weight / total_weight * margin_fit_area
         new_size = item_size.scale(sqrt(target_area/item_size.area))
-        new_item = witem.item.resize_item(new_size)
+        # rendered at its final size once placed
+        new_item = to_placement_item(witem.item).resize_item(new_size)
         result.append(
             WeightedItem(witem.weight, witem.name, new_item)
         )
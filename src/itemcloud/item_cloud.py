@@ -1,9 +1,10 @@
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from PIL import Image
 from itemcloud.containers.base.image_item import ImageItem, set_resize_resampling, set_rotate_resampling
 from itemcloud.logger.base_logger import BaseLogger
-from itemcloud.size import (Size, ResizeType)
+from itemcloud.size import (Size, ResizeType, SizingType)
 from itemcloud.util.parsers import (parse_to_float, parse_to_int)
 from itemcloud.reservations import (Reservation, Reservations, SampledUnreservedOpening)
 from itemcloud.util.search_types import SearchPattern
@@ -23,6 +24,7 @@ from itemcloud.containers.base.weighted_item import (
 )
 import itemcloud.item_cloud_defaults as item_cloud_defaults
 from itemcloud.util.display_map import set_opacity_percentage
+from itemcloud.util.random import seed_random
 # implementation was extrapolated from wordcloud and adapted for generic renderable objects
  
 class ItemCloud(object):
@@ -65,6 +67,10 @@ class ItemCloud(object):
     
     resize_type: ResizeType (default=objectcloud_defaults.DEFAULT_RESIZE_TYPE)
     maximize_type: ResizeType (default=objectcloud_defaults.DEFAULT_RESIZE_TYPE)
+    sizing_type: SizingType (default=objectcloud_defaults.DEFAULT_SIZING_TYPE)
+        How items that do not fit are shrunk: LINEAR shrinks item_step at a time,
+        GALLOPING doubles the steps until a size fits and then bisects back to
+        the largest size that fits. Maximizing grows items the same way.
     
     scale : float (default=objectcloud_defaults.DEFAULT_SCALE)
         Scaling between computation and drawing. For large word-cloud images,
@@ -98,6 +104,15 @@ class ItemCloud(object):
     mode : string (default=objectcloud_defaults.DEFAULT_MODE)
         Transparent background will be generated when mode is "RGBA" and
         background_color is None.
+
+    seed: int | None (default=None)
+        Seeds every random pick (search positions and patterns, fonts, colors)
+        so a run can be replayed exactly. None keeps picks unseeded.
+
+    tiled_reservation_map: bool (default=objectcloud_defaults.DEFAULT_TILED_RESERVATION_MAP)
+        Fit tests read a copy of the reservation map stored as 64x64 tiles in
+        Morton order, instead of the row-major map. Placements are the same
+        either way.
     """
     def __init__(self,
         logger: BaseLogger,
@@ -111,6 +126,7 @@ class ItemCloud(object):
         item_rotation_increment: int | None = None,
         resize_type: ResizeType | None = None,
         maximize_type: ResizeType | None = None,
+        sizing_type: SizingType | None = None,
         scale: float | None = None,
         contour_width: float | None = None,
         contour_color: str | None = None,
@@ -121,7 +137,9 @@ class ItemCloud(object):
         mode: str | None = None,
         name: str | None = None,
         total_threads: int | None = None,
-        search_pattern: SearchPattern | None = None
+        search_pattern: SearchPattern | None = None,
+        seed: int | None = None,
+        tiled_reservation_map: bool | None = None
     ) -> None:
         self._mask: np.ndarray | None = mask.to_nparray() if mask is not None else None
         self._size = size if size is not None else Size.parse(item_cloud_defaults.DEFAULT_CLOUD_SIZE)
@@ -133,6 +151,7 @@ class ItemCloud(object):
         self._item_rotation_increment = item_rotation_increment if item_rotation_increment is not None else parse_to_int(item_cloud_defaults.DEFAULT_ROTATION_INCREMENT)
         self._resize_type = resize_type if resize_type is not None else item_cloud_defaults.DEFAULT_RESIZE_TYPE
         self._maximize_type = maximize_type if maximize_type is not None else item_cloud_defaults.DEFAULT_RESIZE_TYPE
+        self._sizing_type = sizing_type if sizing_type is not None else SizingType[item_cloud_defaults.DEFAULT_SIZING_TYPE]
         self._scale = scale if scale is not None else parse_to_float(item_cloud_defaults.DEFAULT_SCALE)
         self._contour_width = contour_width if contour_width is not None else parse_to_int(item_cloud_defaults.DEFAULT_CONTOUR_WIDTH)
         self._contour_color = contour_color if contour_color is not None else item_cloud_defaults.DEFAULT_CONTOUR_COLOR
@@ -148,10 +167,14 @@ class ItemCloud(object):
         self._name = name if name is not None else 'itemcloud'
         self._total_threads = total_threads if total_threads is not None else parse_to_int(item_cloud_defaults.DEFAULT_TOTAL_THREADS)
         self._search_pattern = search_pattern if search_pattern is not None else SearchPattern[item_cloud_defaults.DEFAULT_SEARCH_PATTERN]
+        self._tiled_reservation_map = tiled_reservation_map if tiled_reservation_map is not None else item_cloud_defaults.DEFAULT_TILED_RESERVATION_MAP
         self.layout_: Layout | None = None
         set_opacity_percentage(self._opacity)
         set_resize_resampling(self._resize_resampling)
         set_rotate_resampling(self._rotate_resampling)
+        self._seed = seed
+        if self._seed is not None:
+            seed_random(self._seed)
 
     @property
     def mask(self) -> np.ndarray | None:
@@ -187,6 +210,18 @@ class ItemCloud(object):
     def maximize_type(self) -> ResizeType:
         return self._maximize_type
 
+    @property
+    def sizing_type(self) -> SizingType:
+        return self._sizing_type
+
+    @property
+    def seed(self) -> int | None:
+        return self._seed
+
+    @property
+    def tiled_reservation_map(self) -> bool:
+        return self._tiled_reservation_map
+
     @property
     def layout(self) -> Layout | None:
         return self.layout_
@@ -264,31 +299,48 @@ class ItemCloud(object):
             self._check_generated()
             layout = self.layout_
         self.layout_ = layout
-        reservations = Reservations.create_reservations(layout.canvas.reservation_map, self._logger)
+        reservations = Reservations.create_reservations(layout.canvas.reservation_map, self._logger, self._tiled_reservation_map)
 
-        new_items: list[LayoutItem] = list()
-        
         total_items = len(layout.items)
+        new_items: list[LayoutItem | None] = [None] * total_items
         maximized_count = 0
         self._logger.info('Maximizing ItemCloud empty-space around  {0} images'.format(total_items))
         self._logger.push_indent('maximizing-empty-space')
         measure = TimeMeasure()
         measure.start()
-        for i in range(total_items - 1, -1, -1):
+        # last placed is maximized first. With more than 1 thread, items that cannot grow into each other are
+        # maximized side by side, a round at a time, each round reserved before the next starts.
+        maximize_order = list(range(total_items - 1, -1, -1))
+        if 1 < self._total_threads:
+            maximize_rounds = reservations.to_maximize_rounds([layout.items[i] for i in maximize_order])
+            self._logger.info('Maximizing in {0} rounds of up to {1} threads'.format(len(maximize_rounds), self._total_threads))
+
+        def maximize(i: int) -> tuple[Reservation, TimeMeasure]:
             layout_item: LayoutItem = layout.items[i]
-            reservation: Reservation = layout_item
-            margin = layout_item.placement_box.get_margin(reservation.reservation_box)
             item_measure = TimeMeasure()
             item_measure.start()
-            self._logger.push_indent('{0}-{1}[{2}/{3}]({4})'.format(layout_item.type.name, layout_item.name, total_items - i, total_items, reservation.reservation_no))
-            self._logger.info('Maximizing...')
-            expanded_reservation = reservations.maximize_existing_reservation(reservation, margin, layout.maximize_type)
+            expanded_reservation = reservations.maximize_existing_reservation(
+                layout_item,
+                layout_item.placement_box.get_margin(layout_item.reservation_box),
+                layout.maximize_type,
+                self._sizing_type
+            )
             item_measure.stop()
+            return (expanded_reservation, item_measure)
+
+        def push_item_indent(i: int) -> None:
+            layout_item: LayoutItem = layout.items[i]
+            self._logger.push_indent('{0}-{1}[{2}/{3}]({4})'.format(layout_item.type.name, layout_item.name, total_items - i, total_items, layout_item.reservation_no))
+
+        def reserve_maximized(i: int, expanded_reservation: Reservation, item_measure: TimeMeasure) -> None:
+            nonlocal maximized_count
+            layout_item: LayoutItem = layout.items[i]
+            reservation: Reservation = layout_item
+            margin = layout_item.placement_box.get_margin(reservation.reservation_box)
             if reservation.reservation_box.equals(expanded_reservation.reservation_box):
                 self._logger.info('Already Maximized ({0})'.format(item_measure.latency_str()))
-                new_items.append(layout_item)
-                self._logger.pop_indent()
-                continue
+                new_items[i] = layout_item
+                return
 
             self._logger.info('Maximized {0} -> {1} ({2})'.format(
                 layout_item.reservation_box.size.size_to_string(),
@@ -296,15 +348,13 @@ class ItemCloud(object):
                 item_measure.latency_str()
             ))
             if reservations.reserve_opening(layout_item.name, layout_item.reservation_no, expanded_reservation.reservation_box, expanded_reservation.reservation_party, margin):
-                
-                new_items.append(
-                    layout_item.to_reserved_item(
-                        expanded_reservation.reservation_box.remove_margin(margin),
-                        layout_item.rotated_degrees,
-                        expanded_reservation.reservation_box,
-                        item_measure.latency_str(),
-                        expanded_reservation.reservation_party
-                    )
+
+                new_items[i] = layout_item.to_reserved_item(
+                    expanded_reservation.reservation_box.remove_margin(margin),
+                    layout_item.rotated_degrees,
+                    expanded_reservation.reservation_box,
+                    item_measure.latency_str(),
+                    expanded_reservation.reservation_party
                 )
                 maximized_count += 1
                 self._logger.info('resized {0} -> {1} ({2})'.format(
@@ -320,7 +370,38 @@ class ItemCloud(object):
                     item_measure.latency_str(),
                 ))
 
-            self._logger.pop_indent()
+        if self._total_threads <= 1:
+            for i in maximize_order:
+                push_item_indent(i)
+                self._logger.info('Maximizing...')
+                reserve_maximized(i, *maximize(i))
+                self._logger.pop_indent()
+        else:
+            with ThreadPoolExecutor(max_workers=self._total_threads) as executor:
+                for maximize_round in maximize_rounds:
+                    round_items = [maximize_order[index] for index in maximize_round]
+                    for i in round_items:
+                        push_item_indent(i)
+                        self._logger.info('Maximizing...')
+                        self._logger.pop_indent()
+                    if 1 == len(round_items):
+                        maximized = [maximize(round_items[0])]
+                    else:
+                        maximized = list(executor.map(maximize, round_items))
+                    for i, (expanded_reservation, item_measure) in zip(round_items, maximized):
+                        layout_item: LayoutItem = layout.items[i]
+                        push_item_indent(i)
+                        if 1 < len(round_items) and not(reservations.can_reserve_opening(
+                            layout_item.reservation_no,
+                            expanded_reservation.reservation_box,
+                            expanded_reservation.reservation_party,
+                            layout_item.placement_box.get_margin(layout_item.reservation_box)
+                        )):
+                            # grew into cells reserved earlier in its round, grow it again over them
+                            self._logger.info('Maximized into its round, maximizing again')
+                            expanded_reservation, item_measure = maximize(i)
+                        reserve_maximized(i, expanded_reservation, item_measure)
+                        self._logger.pop_indent()
 
         measure.stop()
         latency_str = f"{measure.latency_str()}({format_ms_duration(measure.latency_ms() / total_items)}/item)"
@@ -331,7 +412,7 @@ class ItemCloud(object):
             latency_str
         ))    
         
-        new_items.reverse()
+        new_items = [new_item for new_item in new_items if new_item is not None]
         self.layout_ = Layout(
             LayoutCanvas(
                 layout.canvas.size,
@@ -375,7 +456,7 @@ class ItemCloud(object):
             raise ValueError("We need at least 1 item to plot a ItemCloud, "
                              "got %d." % len(proportional_items))
         
-        reservations = Reservations(self._logger, ObjectCloud_size, self._total_threads)
+        reservations = Reservations(self._logger, ObjectCloud_size, self._total_threads, self._tiled_reservation_map)
         search_properties = SearchProperties.start(reservations.reservation_area, self._search_pattern)
 
         layout_items: list[LayoutItem] = list()
@@ -440,7 +521,8 @@ class ItemCloud(object):
                 self._resize_type,
                 self._item_step,
                 self._item_rotation_increment,
-                search_properties
+                search_properties,
+                self._sizing_type
             )
             measure.stop()
             if sampled_result.found:
@@ -475,7 +557,7 @@ class ItemCloud(object):
             else:
                 self._logger.info('Dropping item: samplings({0}). {1} resize({2} -> {3}) ({4})'.format(
                     sampled_result.sampling_total,
-                    'Item resized too small' if sampled_result.new_size.is_less_than(self._min_item_size) else '',
+                    'Item resized too small' if sampled_result.new_item.is_less_than(self._min_item_size) else '',
                     item.size_to_string(),
                     sampled_result.new_item.size_to_string(),
                     measure.latency_str()
@@ -1,5 +1,5 @@
 
-from itemcloud.size import ResizeType
+from itemcloud.size import ResizeType, SizingType
 from itemcloud.util.search_types import SEARCH_PATTERNS
 DEFAULT_CLOUD_SIZE = '400,200'
 DEFAULT_STEP_SIZE = '1'
@@ -15,11 +15,15 @@ DEFAULT_RESAMPLING = '3'
 DEFAULT_MODE = 'RGBA'
 DEFAULT_MAX_ITEMS = '200'
 DEFAULT_RESIZE_TYPE = 'MAINTAIN_ASPECT_RATIO'
+DEFAULT_SIZING_TYPE = 'LINEAR'
 DEFAULT_SCALE = '1.0'
 DEFAULT_TOTAL_THREADS = '1'
 DEFAULT_SEARCH_PATTERN = 'NONE'
+DEFAULT_SEED = None
+DEFAULT_TILED_RESERVATION_MAP = False
 
 SEARCH_PATTERN_HELP = '''Search for openings using a pattern: https://i.ytimg.com/vi/8rXv-0gg-ZY/maxresdefault.jpg
+ARCHIMEDEAN places each item at the first opening along a spiral out from the center.
 {0}'''.format('|'.join(SEARCH_PATTERNS))
 MAX_ITEM_SIZE_HELP = '''Maximum item size for the largest item.
 If None, height of the item is used.
@@ -37,6 +41,9 @@ while other entries will be free to draw on.\
 CLOUD_SIZE_HELP = 'width and height of canvas'
 
 RESIZE_TYPE_HELP = 'Image resizing can be done by maintaining aspect ratio ({0}), step/width percent change evenly applied ({1}), or simply step change ({2})'.format(ResizeType.MAINTAIN_ASPECT_RATIO.name, ResizeType.MAINTAIN_PERCENTAGE_CHANGE.name, ResizeType.NO_RESIZE_TYPE.name)
+SIZING_TYPE_HELP = 'Items that do not fit are shrunk by step size one step at a time ({0}), or by doubling steps until one fits and then bisecting back to the largest size that fits ({1}). Maximizing grows items the same way'.format(SizingType.LINEAR.name, SizingType.GALLOPING.name)
+SEED_HELP = 'Seeds every random pick (search positions and patterns, fonts, colors) so a run can be replayed exactly'
+TILED_RESERVATION_MAP_HELP = 'fit tests read a copy of the reservation map stored as 64x64 tiles in Morton order, instead of the row-major map'
 STEP_SIZE_HELP = '''Step size for the item. 
 step > 1 might speed up computation
 but give a worse fit.
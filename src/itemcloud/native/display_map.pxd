@@ -7,6 +7,30 @@ from itemcloud.native.box cimport Box, create_box
 ctypedef (int, int) DISPLAY_MAP_SIZE_TYPE
 ctypedef unsigned int[:,:] DISPLAY_MAP_TYPE
 ctypedef unsigned int[:] DISPLAY_BUFFER_TYPE
+# 1 bit per cell occupancy, cell col lives in bit (col % 64) of word (col / 64) of its row
+ctypedef unsigned long long[:,:] PACKED_DISPLAY_MAP_TYPE
+# occupied runs of a display map, a (row, col, length) row per run in row-major order
+ctypedef int[:,:] DISPLAY_MAP_RUNS_TYPE
+
+cdef enum:
+    PACKED_WORD_BITS = 64
+    PACKED_WORD_SHIFT = 6
+    PACKED_WORD_MASK = 63
+
+# display map cut into TILE_SIZE x TILE_SIZE tiles, row-major within a tile. Cell (row, col) lives at
+# tiled_map[tile_order[row >> TILE_SHIFT, col >> TILE_SHIFT], row & TILE_MASK, col & TILE_MASK]
+ctypedef unsigned int[:,:,::1] TILED_DISPLAY_MAP_TYPE
+ctypedef int[:,:] TILE_ORDER_TYPE
+
+cdef enum:
+    RUN_ROW = 0
+    RUN_COL = 1
+    RUN_LENGTH = 2
+
+cdef enum:
+    TILE_SIZE = 64
+    TILE_SHIFT = 6
+    TILE_MASK = 63
 
 cdef inline Size from_displaymap_size(DISPLAY_MAP_TYPE display_map) noexcept nogil:
     return create_size(display_map.shape[1], display_map.shape[0]) # cols == width, rows == height
@@ -30,6 +54,28 @@ cdef inline int box_bottom_corner_col(Box box) noexcept nogil:
 cdef inline Box from_displaymap_box(DISPLAY_MAP_TYPE display_map) noexcept nogil:
     return create_box(0,0, display_map.shape[1], display_map.shape[0]) # cols == width, rows == height
 
+# occupancy index is a summed-area table of shape (rows + 1, cols + 1)
+# occupancy_index[row, col] == number of occupied cells in display_map[0:row, 0:col]
+cdef inline unsigned int occupied_count(DISPLAY_MAP_TYPE occupancy_index, Box area) noexcept nogil:
+    return (
+        occupancy_index[area.lower, area.right]
+        - occupancy_index[area.upper, area.right]
+        - occupancy_index[area.lower, area.left]
+        + occupancy_index[area.upper, area.left]
+    )
+
+cdef inline int packed_words(int cols) noexcept nogil:
+    return (cols + PACKED_WORD_MASK) >> PACKED_WORD_SHIFT
+
+cdef inline unsigned long long packed_bits_at(PACKED_DISPLAY_MAP_TYPE packed_map, int row, int col) noexcept nogil:
+    # the 64 cells of row starting at col, straddling 2 words when col is not word aligned
+    cdef int word = col >> PACKED_WORD_SHIFT
+    cdef int shift = col & PACKED_WORD_MASK
+    cdef unsigned long long bits = packed_map[row, word] >> shift
+    if 0 != shift and (word + 1) < packed_map.shape[1]:
+        bits = bits | (packed_map[row, word + 1] << (PACKED_WORD_BITS - shift))
+    return bits
+
 cdef int is_outside_target(
     DISPLAY_MAP_TYPE item,
     DISPLAY_MAP_TYPE target,
@@ -51,7 +97,63 @@ cdef int can_fit_on_target(
     unsigned int item_id
 ) noexcept nogil
 
-cdef void write_to_margined_item(
+cdef unsigned int write_to_target(
+    DISPLAY_MAP_TYPE item,
+    DISPLAY_MAP_TYPE target,
+    Box target_location,
+    unsigned int item_id
+) noexcept nogil
+
+cdef void write_occupancy_index(
+    DISPLAY_MAP_TYPE target,
+    DISPLAY_MAP_TYPE occupancy_index,
+    Box written_box
+) noexcept nogil
+
+cdef Box find_occupied_box(
+    DISPLAY_MAP_TYPE item
+) noexcept nogil
+
+cdef void write_packed_display_map(
+    DISPLAY_MAP_TYPE display_map,
+    PACKED_DISPLAY_MAP_TYPE packed_map,
+    Box written_box
+) noexcept nogil
+
+cdef int can_fit_on_packed_target(
+    PACKED_DISPLAY_MAP_TYPE packed_item,
+    PACKED_DISPLAY_MAP_TYPE packed_target,
+    int target_row,
+    int target_col
+) noexcept nogil
+
+cdef int can_fit_on_tiled_target(
+    DISPLAY_MAP_TYPE item,
+    TILED_DISPLAY_MAP_TYPE tiled_target,
+    TILE_ORDER_TYPE tile_order,
+    Size target_size,
+    Box target_item_box,
+    unsigned int item_id
+) noexcept nogil
+
+cdef unsigned int write_to_tiled_target(
+    DISPLAY_MAP_TYPE item,
+    TILED_DISPLAY_MAP_TYPE tiled_target,
+    TILE_ORDER_TYPE tile_order,
+    Box target_location,
+    unsigned int item_id
+) noexcept nogil
+
+cdef int can_fit_runs_on_target(
+    DISPLAY_MAP_RUNS_TYPE item_runs,
+    Size item_size,
+    DISPLAY_MAP_TYPE target,
+    DISPLAY_MAP_TYPE occupancy_index,
+    Box target_item_box,
+    unsigned int item_id
+) noexcept nogil
+
+cdef int write_display_map_runs(
     DISPLAY_MAP_TYPE item,
-    DISPLAY_MAP_TYPE margined_item
-) noexcept nogil
\ No newline at end of file
+    DISPLAY_MAP_RUNS_TYPE runs
+) noexcept nogil
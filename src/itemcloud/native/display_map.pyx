@@ -4,8 +4,8 @@
 # distutils: language = c++
 # distutils: extra_compile_args = -std=c++11
 cimport cython
+from libc.stdlib cimport malloc, calloc, free
 from itemcloud.native.box cimport Box, size_from_box, contains, box_height, box_width
-from itemcloud.native.math cimport rounded_division
 from itemcloud.native.size cimport Size
 
 #
@@ -64,63 +64,286 @@ cdef int can_fit_on_target(
 
     return 1
 
-cdef void write_to_margined_item(
+cdef unsigned int write_to_target(
     DISPLAY_MAP_TYPE item,
-    DISPLAY_MAP_TYPE margined_item
+    DISPLAY_MAP_TYPE target,
+    Box target_location,
+    unsigned int item_id
+) noexcept nogil:
+    # writes item_id wherever item is occupied, returning the cells written
+    cdef int item_row = 0
+    cdef int item_col = 0
+    cdef int target_row = box_top_corner_row(target_location)
+    cdef int target_col = box_top_corner_col(target_location)
+    cdef unsigned int result = 0
+
+    for item_row in range(item.shape[0]):
+        for item_col in range(item.shape[1]):
+            if item[item_row, item_col] != 0:
+                result += 1
+                target[target_row + item_row, target_col + item_col] = item_id
+    return result
+
+cdef void write_occupancy_index(
+    DISPLAY_MAP_TYPE target,
+    DISPLAY_MAP_TYPE occupancy_index,
+    Box written_box
+) noexcept nogil:
+    # only sums at, or below-right of, the written box's top corner include the written cells
+    cdef int row = 0
+    cdef int col = 0
+    cdef int target_rows = target.shape[0]
+    cdef int target_cols = target.shape[1]
+    cdef unsigned int occupied = 0
+
+    for row in range(box_top_corner_row(written_box), target_rows):
+        for col in range(box_top_corner_col(written_box), target_cols):
+            occupied = 1 if target[row, col] != 0 else 0
+            occupancy_index[row + 1, col + 1] = (
+                occupied
+                + occupancy_index[row, col + 1]
+                + occupancy_index[row + 1, col]
+                - occupancy_index[row, col]
+            )
+
+cdef void write_packed_display_map(
+    DISPLAY_MAP_TYPE display_map,
+    PACKED_DISPLAY_MAP_TYPE packed_map,
+    Box written_box
+) noexcept nogil:
+    # repack every word overlapping the written box from its display map cells
+    cdef int row = 0
+    cdef int word = 0
+    cdef int col = 0
+    cdef int last_col = 0
+    cdef int display_cols = display_map.shape[1]
+    cdef int first_word = box_top_corner_col(written_box) >> PACKED_WORD_SHIFT
+    cdef int last_word = packed_words(box_bottom_corner_col(written_box))
+    cdef unsigned long long bits = 0
+
+    for row in range(box_top_corner_row(written_box), box_bottom_corner_row(written_box)):
+        for word in range(first_word, last_word):
+            bits = 0
+            last_col = (word + 1) << PACKED_WORD_SHIFT
+            if display_cols < last_col:
+                last_col = display_cols
+            for col in range(word << PACKED_WORD_SHIFT, last_col):
+                if display_map[row, col] != 0:
+                    bits = bits | ((<unsigned long long>1) << (col & PACKED_WORD_MASK))
+            packed_map[row, word] = bits
+
+cdef int can_fit_on_packed_target(
+    PACKED_DISPLAY_MAP_TYPE packed_item,
+    PACKED_DISPLAY_MAP_TYPE packed_target,
+    int target_row,
+    int target_col
+) noexcept nogil:
+    # 64 cells per test; item bits past its last col are 0 so straddled target cells are ignored
+    cdef int item_row = 0
+    cdef int item_word = 0
+    cdef int item_rows = packed_item.shape[0]
+    cdef int item_words = packed_item.shape[1]
+
+    for item_row in range(item_rows):
+        for item_word in range(item_words):
+            if 0 != (packed_item[item_row, item_word] & packed_bits_at(
+                packed_target,
+                target_row + item_row,
+                target_col + (item_word << PACKED_WORD_SHIFT)
+            )):
+                return 0
+    return 1
+
+cdef int write_display_map_runs(
+    DISPLAY_MAP_TYPE item,
+    DISPLAY_MAP_RUNS_TYPE runs
+) noexcept nogil:
+    # writes item's occupied runs while runs has room, returning how many item has
+    cdef int item_rows = item.shape[0]
+    cdef int item_cols = item.shape[1]
+    cdef int max_runs = runs.shape[0]
+    cdef int row = 0
+    cdef int col = 0
+    cdef int start = 0
+    cdef int result = 0
+
+    for row in range(item_rows):
+        col = 0
+        while col < item_cols:
+            if item[row, col] == 0:
+                col = col + 1
+                continue
+            start = col
+            while col < item_cols and item[row, col] != 0:
+                col = col + 1
+            if result < max_runs:
+                runs[result, RUN_ROW] = row
+                runs[result, RUN_COL] = start
+                runs[result, RUN_LENGTH] = col - start
+            result = result + 1
+    return result
+
+cdef int can_fit_runs_on_target(
+    DISPLAY_MAP_RUNS_TYPE item_runs,
+    Size item_size,
+    DISPLAY_MAP_TYPE target,
+    DISPLAY_MAP_TYPE occupancy_index,
+    Box target_item_box,
+    unsigned int item_id
+) noexcept nogil:
+    # as can_fit_on_target, testing only the item's occupied runs. A run over no occupied target cells
+    # (by the occupancy index) fits, otherwise only cells of item_id can be under it.
+    cdef int target_item_row = box_top_corner_row(target_item_box)
+    cdef int target_item_col = box_top_corner_col(target_item_box)
+    cdef int run = 0
+    cdef int row = 0
+    cdef int first_col = 0
+    cdef int last_col = 0
+    cdef int col = 0
+    cdef unsigned int cell = 0
+
+    if target.shape[0] < (target_item_row + item_size.height) or target.shape[1] < (target_item_col + item_size.width):
+        return 0
+    for run in range(item_runs.shape[0]):
+        row = target_item_row + item_runs[run, RUN_ROW]
+        first_col = target_item_col + item_runs[run, RUN_COL]
+        last_col = first_col + item_runs[run, RUN_LENGTH]
+        if 0 == occupied_count(occupancy_index, create_box(first_col, row, last_col, row + 1)):
+            continue
+        if 0 == item_id:
+            return 0
+        for col in range(first_col, last_col):
+            cell = target[row, col]
+            if cell != 0 and cell != item_id:
+                return 0
+    return 1
+
+cdef inline int _tile_end(int position, int end) noexcept nogil:
+    # end of the run from position that stays in position's tile
+    cdef int tile_end = ((position >> TILE_SHIFT) + 1) << TILE_SHIFT
+    return tile_end if tile_end < end else end
+
+cdef int can_fit_on_tiled_target(
+    DISPLAY_MAP_TYPE item,
+    TILED_DISPLAY_MAP_TYPE tiled_target,
+    TILE_ORDER_TYPE tile_order,
+    Size target_size,
+    Box target_item_box,
+    unsigned int item_id
+) noexcept nogil:
+    # as can_fit_on_target, a tile of the window at a time so each tile's cells are read together
+    cdef int target_item_row = box_top_corner_row(target_item_box)
+    cdef int target_item_col = box_top_corner_col(target_item_box)
+    cdef int last_row = target_item_row + item.shape[0]
+    cdef int last_col = target_item_col + item.shape[1]
+    cdef int first_row = target_item_row
+    cdef int first_col = 0
+    cdef int tile_last_row = 0
+    cdef int tile_last_col = 0
+    cdef int tile = 0
+    cdef int row = 0
+    cdef int col = 0
+    cdef int item_row = 0
+    cdef int item_col = 0
+    cdef unsigned int* tile_cells = NULL
+
+    if target_size.height < last_row or target_size.width < last_col:
+        return 0
+    while first_row < last_row:
+        tile_last_row = _tile_end(first_row, last_row)
+        first_col = target_item_col
+        while first_col < last_col:
+            tile_last_col = _tile_end(first_col, last_col)
+            tile = tile_order[first_row >> TILE_SHIFT, first_col >> TILE_SHIFT]
+            for row in range(first_row, tile_last_row):
+                item_row = row - target_item_row
+                item_col = first_col - target_item_col
+                tile_cells = &tiled_target[tile, row & TILE_MASK, first_col & TILE_MASK]
+                for col in range(tile_last_col - first_col):
+                    if 0 == can_overlap(item[item_row, item_col + col], tile_cells[col], item_id):
+                        return 0
+            first_col = tile_last_col
+        first_row = tile_last_row
+    return 1
+
+cdef unsigned int write_to_tiled_target(
+    DISPLAY_MAP_TYPE item,
+    TILED_DISPLAY_MAP_TYPE tiled_target,
+    TILE_ORDER_TYPE tile_order,
+    Box target_location,
+    unsigned int item_id
 ) noexcept nogil:
+    # as write_to_target, a tile at a time
+    cdef int target_row = box_top_corner_row(target_location)
+    cdef int target_col = box_top_corner_col(target_location)
+    cdef int last_row = target_row + item.shape[0]
+    cdef int last_col = target_col + item.shape[1]
+    cdef int first_row = target_row
+    cdef int first_col = 0
+    cdef int tile_last_row = 0
+    cdef int tile_last_col = 0
+    cdef int tile = 0
     cdef int row = 0
-    cdef int prow = 0
     cdef int col = 0
-    cdef int pcol = 0
+    cdef unsigned int result = 0
+
+    while first_row < last_row:
+        tile_last_row = _tile_end(first_row, last_row)
+        first_col = target_col
+        while first_col < last_col:
+            tile_last_col = _tile_end(first_col, last_col)
+            tile = tile_order[first_row >> TILE_SHIFT, first_col >> TILE_SHIFT]
+            for row in range(first_row, tile_last_row):
+                for col in range(first_col, tile_last_col):
+                    if item[row - target_row, col - target_col] != 0:
+                        result += 1
+                        tiled_target[tile, row & TILE_MASK, col & TILE_MASK] = item_id
+            first_col = tile_last_col
+        first_row = tile_last_row
+    return result
+
+cdef Box find_occupied_box(
+    DISPLAY_MAP_TYPE item
+) noexcept nogil:
+    # largest rectangle of the item whose cells are all occupied (maximal rectangle in a histogram, row by row)
     cdef int item_rows = item.shape[0]
     cdef int item_cols = item.shape[1]
-    cdef int margined_rows = margined_item.shape[0]
-    cdef int margined_cols = margined_item.shape[1]
-    cdef int padding = rounded_division(margined_rows - item_rows, 2)
-    cdef int i = 0
+    cdef int* heights = <int*>calloc(item_cols + 1, sizeof(int))
+    cdef int* stack = <int*>malloc((item_cols + 1) * sizeof(int))
+    cdef int row = 0
+    cdef int col = 0
+    cdef int top = 0
+    cdef int height = 0
+    cdef int left = 0
+    cdef int area = 0
+    cdef int largest_area = 0
+    cdef Box result = create_box(0, 0, 0, 0)
+
+    if heights == NULL or stack == NULL:
+        free(heights)
+        free(stack)
+        return result
 
-    # set passed item into shape padding distance into shape
     for row in range(item_rows):
         for col in range(item_cols):
-            margined_item[row + padding, col + padding] = item[row, col]
-    
-    if margined_rows == item_rows and margined_cols == item_cols:
-        return
-    
-    # left -> right for each row
-    for row in range(margined_rows):
-        for col in range(margined_cols):
-            if margined_item[row, col] == 1:
-                pcol = col - padding
-                for i in range(padding):
-                    margined_item[row, pcol + i] = 1
-                break
-
-    # right -> left for each row
-    for row in range(margined_rows, 0, -1):
-        for col in range(margined_cols, 0, -1):
-            if margined_item[row, col] == 1:
-                for i in range(padding):
-                    margined_item[row, col + i] = 1
-                break
-
-    # upper -> lower for each row
-    for col in range(margined_cols):
-        for row in range(margined_rows):
-            if margined_item[row, col] == 1:
-                prow = row - padding
-                for i in range(padding):
-                    margined_item[prow + i, col] = 1
-                break
-
-    # lower -> upper for each row
-    for col in range(margined_cols - 1, 0, -1):
-        for row in range(margined_rows - 1, 0, -1):
-            if margined_item[row, col] == 1:
-                for i in range(padding):
-                    margined_item[row + i, col] = 1
-                break
+            heights[col] = heights[col] + 1 if item[row, col] != 0 else 0
+        # heights[item_cols] is always 0, flushing the stack at the end of each row
+        top = 0
+        for col in range(item_cols + 1):
+            while 0 < top and heights[col] < heights[stack[top - 1]]:
+                top = top - 1
+                height = heights[stack[top]]
+                left = stack[top - 1] + 1 if 0 < top else 0
+                area = height * (col - left)
+                if largest_area < area:
+                    largest_area = area
+                    result = create_box(left, row + 1 - height, col, row + 1)
+            stack[top] = col
+            top = top + 1
 
+    free(heights)
+    free(stack)
+    return result
 
 def native_can_fit_on_target(
     DISPLAY_MAP_TYPE item,
@@ -130,5 +353,65 @@ def native_can_fit_on_target(
 ):
     return can_fit_on_target(item, target, target_item_box, item_id)
 
-def native_write_to_margined_item(DISPLAY_MAP_TYPE item, DISPLAY_MAP_TYPE margined_item): # return nothing
-    write_to_margined_item(item, margined_item)
+def native_write_to_target(
+    DISPLAY_MAP_TYPE item,
+    DISPLAY_MAP_TYPE target,
+    Box target_location,
+    unsigned int item_id
+): # return written cell count
+    cdef unsigned int result = 0
+    with nogil:
+        result = write_to_target(item, target, target_location, item_id)
+    return result
+
+def native_write_occupancy_index(DISPLAY_MAP_TYPE target, DISPLAY_MAP_TYPE occupancy_index, Box written_box): # return nothing
+    write_occupancy_index(target, occupancy_index, written_box)
+
+def native_find_occupied_box(DISPLAY_MAP_TYPE item): # return native_box
+    return find_occupied_box(item)
+
+def native_write_packed_display_map(DISPLAY_MAP_TYPE display_map, PACKED_DISPLAY_MAP_TYPE packed_map, Box written_box): # return nothing
+    write_packed_display_map(display_map, packed_map, written_box)
+
+def native_can_fit_on_packed_target(
+    PACKED_DISPLAY_MAP_TYPE packed_item,
+    PACKED_DISPLAY_MAP_TYPE packed_target,
+    int target_row,
+    int target_col
+):
+    return can_fit_on_packed_target(packed_item, packed_target, target_row, target_col)
+
+def native_write_display_map_runs(DISPLAY_MAP_TYPE item, DISPLAY_MAP_RUNS_TYPE runs): # return run count
+    return write_display_map_runs(item, runs)
+
+def native_can_fit_runs_on_target(
+    DISPLAY_MAP_RUNS_TYPE item_runs,
+    Size item_size,
+    DISPLAY_MAP_TYPE target,
+    DISPLAY_MAP_TYPE occupancy_index,
+    Box target_item_box,
+    unsigned int item_id
+):
+    return can_fit_runs_on_target(item_runs, item_size, target, occupancy_index, target_item_box, item_id)
+
+def native_can_fit_on_tiled_target(
+    DISPLAY_MAP_TYPE item,
+    TILED_DISPLAY_MAP_TYPE tiled_target,
+    TILE_ORDER_TYPE tile_order,
+    Size target_size,
+    Box target_item_box,
+    unsigned int item_id
+):
+    return can_fit_on_tiled_target(item, tiled_target, tile_order, target_size, target_item_box, item_id)
+
+def native_write_to_tiled_target(
+    DISPLAY_MAP_TYPE item,
+    TILED_DISPLAY_MAP_TYPE tiled_target,
+    TILE_ORDER_TYPE tile_order,
+    Box target_location,
+    unsigned int item_id
+): # return written cell count
+    cdef unsigned int result = 0
+    with nogil:
+        result = write_to_tiled_target(item, tiled_target, tile_order, target_location, item_id)
+    return result
@@ -2,6 +2,12 @@
 # cython: boundscheck=False
 # cython: wraparound=False
 
+cdef void seed_random(unsigned long long seed) noexcept nogil
+
+cdef void seed_thread_random(unsigned long long seed) noexcept nogil
+
+cdef unsigned int next_random() noexcept nogil
+
 cdef int randint(int lower, int upper) noexcept nogil
 
 cdef inline int randindex(int array_length) noexcept nogil:
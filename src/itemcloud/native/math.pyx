@@ -4,13 +4,58 @@
 cimport cython
 from libc.limits cimport INT_MAX
 from libc.math cimport round, pi, sin, cos, abs, sqrt
-from libc.stdlib cimport rand, srand, RAND_MAX
 from libc.time cimport time
 
-srand(time(NULL))
+# xorshift64* generator with 1 state per thread. Every thread restarts from the shared seed
+# the first time it draws after seed_random(); seed_thread_random() restarts just the calling thread.
+cdef extern from *:
+    """
+    #if defined(_MSC_VER)
+    #define ITEMCLOUD_THREAD_LOCAL __declspec(thread)
+    #else
+    #define ITEMCLOUD_THREAD_LOCAL __thread
+    #endif
+    static unsigned long long itemcloud_random_seed = 0;
+    static unsigned long long itemcloud_random_generation = 0;
+    static ITEMCLOUD_THREAD_LOCAL unsigned long long itemcloud_thread_random_state = 0;
+    static ITEMCLOUD_THREAD_LOCAL unsigned long long itemcloud_thread_random_generation = 0;
+    """
+    unsigned long long itemcloud_random_seed
+    unsigned long long itemcloud_random_generation
+    unsigned long long itemcloud_thread_random_state
+    unsigned long long itemcloud_thread_random_generation
+
+cdef inline unsigned long long _mix_seed(unsigned long long seed) noexcept nogil:
+    # splitmix64 finalizer, never 0 so xorshift cannot get stuck
+    seed = seed + <unsigned long long>0x9E3779B97F4A7C15
+    seed = (seed ^ (seed >> 30)) * <unsigned long long>0xBF58476D1CE4E5B9
+    seed = (seed ^ (seed >> 27)) * <unsigned long long>0x94D049BB133111EB
+    seed = seed ^ (seed >> 31)
+    return seed if 0 != seed else 1
+
+cdef void seed_random(unsigned long long seed) noexcept nogil:
+    global itemcloud_random_seed, itemcloud_random_generation
+    itemcloud_random_seed = seed
+    itemcloud_random_generation += 1
+
+cdef void seed_thread_random(unsigned long long seed) noexcept nogil:
+    global itemcloud_thread_random_state, itemcloud_thread_random_generation
+    itemcloud_thread_random_state = _mix_seed(seed)
+    itemcloud_thread_random_generation = itemcloud_random_generation
+
+cdef unsigned int next_random() noexcept nogil:
+    global itemcloud_thread_random_state
+    if itemcloud_thread_random_generation != itemcloud_random_generation:
+        seed_thread_random(itemcloud_random_seed)
+    itemcloud_thread_random_state ^= itemcloud_thread_random_state >> 12
+    itemcloud_thread_random_state ^= itemcloud_thread_random_state << 25
+    itemcloud_thread_random_state ^= itemcloud_thread_random_state >> 27
+    return <unsigned int>((itemcloud_thread_random_state * <unsigned long long>0x2545F4914F6CDD1D) >> 33)
+
+seed_random(<unsigned long long>time(NULL))
 
 cdef int randint(int lower, int upper) noexcept nogil:
-    return (rand() % (upper - lower))
+    return <int>(next_random() % <unsigned int>(upper - lower))
 
 cdef double distance(int origin_x, int origin_y, int target_x, int target_y) noexcept nogil:
     cdef double x1 = origin_x
@@ -50,8 +95,8 @@ cdef int rounded_division(int numerator, int denominator) noexcept nogil:
     cdef double d = denominator
     return <int>round(n/d)
 
+def native_seed_random(unsigned long long seed): # return nothing
+    seed_random(seed)
 
-
-
-
-
+def native_seed_thread_random(unsigned long long seed): # return nothing
+    seed_thread_random(seed)
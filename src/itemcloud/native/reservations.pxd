@@ -1,9 +1,10 @@
 # cython: language_level=3
 # cython: boundscheck=False
 # cython: wraparound=False
-from itemcloud.native.display_map cimport DISPLAY_MAP_TYPE, DISPLAY_BUFFER_TYPE
+from itemcloud.native.display_map cimport DISPLAY_MAP_TYPE, DISPLAY_BUFFER_TYPE, PACKED_DISPLAY_MAP_TYPE
 from itemcloud.native.size cimport Size, ResizeType
 from itemcloud.native.box cimport Box
+from itemcloud.native.search cimport SearchProperties
 
 ctypedef struct Reservations:
     int num_threads
@@ -23,5 +24,37 @@ cdef Box[::1] find_openings(
     Reservations self,
     DISPLAY_BUFFER_TYPE self_position_buffer,
     DISPLAY_MAP_TYPE self_reservation_map,
-    DISPLAY_MAP_TYPE party
-) noexcept nogil
\ No newline at end of file
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party
+) noexcept nogil
+
+cdef Box[::1] find_openings_in_area(
+    Reservations self,
+    DISPLAY_BUFFER_TYPE self_position_buffer,
+    DISPLAY_MAP_TYPE self_reservation_map,
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    Box origin_area
+) noexcept nogil
+
+cdef Box find_searched_opening(
+    Reservations self,
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    SearchProperties search
+) noexcept nogil
+
+cdef Box find_spiral_opening(
+    Reservations self,
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    SearchProperties search
+) noexcept nogil
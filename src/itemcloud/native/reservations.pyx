@@ -4,14 +4,17 @@
 # distutils: language = c++
 # distutils: extra_compile_args = -std=c++11
 cimport cython
-from libcpp.atomic cimport atomic
+from libc.stdlib cimport calloc, malloc, free
 from cython.parallel cimport parallel, prange
-from libc.math cimport fmod
+from libc.math cimport fmod, sqrt, atan2, floor, M_PI
 from libc.time cimport time
 cdef extern from "stdio.h":
     int snprintf(char *str, unsigned int size, const char *format, ...) noexcept nogil
 from itemcloud.native.display_map cimport (
     can_fit_on_target,
+    can_fit_on_packed_target,
+    occupied_count,
+    find_occupied_box,
     from_displaymap_box,
     from_displaymap_size
 )
@@ -22,9 +25,19 @@ from itemcloud.native.size cimport (
 )
 from itemcloud.native.box cimport (
     Box,
+    box_width,
+    box_height,
     create_box,
-    create_box_array
+    create_box_array,
+    empty_box,
+    is_empty
 )
+from itemcloud.native.search cimport (
+    SearchProperties,
+    contains_search_position,
+    relative_position
+)
+from itemcloud.native.search_types cimport RelativeDistance
 
 cdef int _is_unreserved(
     Reservations self,
@@ -39,49 +52,519 @@ cdef int _is_unreserved(
         0
     )
 
+cdef inline int _is_occupied(
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    Box occupied_party_box,
+    int row,
+    int col
+) noexcept nogil:
+    # O(1) rejection: the party's fully occupied box must land on unoccupied cells only
+    return 0 != occupied_count(
+        self_occupancy_index,
+        create_box(
+            col + occupied_party_box.left,
+            row + occupied_party_box.upper,
+            col + occupied_party_box.right,
+            row + occupied_party_box.lower
+        )
+    )
+
+cdef inline int _can_reserve(
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    Box occupied_party_box,
+    int is_solid_party,
+    int row,
+    int col
+) noexcept nogil:
+    if _is_occupied(self_occupancy_index, occupied_party_box, row, col):
+        return 0
+    if 1 == is_solid_party:
+        return 1
+    return can_fit_on_packed_target(
+        packed_party,
+        self_packed_reservation_map,
+        row,
+        col
+    )
+
+cdef enum:
+    # candidate origins are first tested OPENING_BLOCK_SIZE x OPENING_BLOCK_SIZE at a time
+    OPENING_BLOCK_SIZE = 16
+
+cdef enum BlockReservation:
+    BLOCK_RESERVED = 0
+    BLOCK_UNRESERVED = 1
+    BLOCK_MIXED = 2
+
+cdef inline BlockReservation _test_block(
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    Size party_size,
+    Box occupied_party_box,
+    int first_row,
+    int first_col,
+    int last_row,
+    int last_col
+) noexcept nogil:
+    # Coarse test of every origin in [first_row, last_row] x [first_col, last_col] at once.
+    # Every origin's occupied party box covers the block's common region: any occupancy there rejects them all.
+    # The party's box at every origin lies inside the block's footprint: no occupancy there accepts them all.
+    cdef Box common_area = create_box(
+        last_col + occupied_party_box.left,
+        last_row + occupied_party_box.upper,
+        first_col + occupied_party_box.right,
+        first_row + occupied_party_box.lower
+    )
+    if common_area.left < common_area.right and common_area.upper < common_area.lower:
+        if 0 != occupied_count(self_occupancy_index, common_area):
+            return BlockReservation.BLOCK_RESERVED
+    if 0 == occupied_count(
+        self_occupancy_index,
+        create_box(first_col, first_row, last_col + party_size.width, last_row + party_size.height)
+    ):
+        return BlockReservation.BLOCK_UNRESERVED
+    return BlockReservation.BLOCK_MIXED
+
 cdef Box[::1] find_openings(
     Reservations self,
     DISPLAY_BUFFER_TYPE self_position_buffer,
     DISPLAY_MAP_TYPE self_reservation_map,
-    DISPLAY_MAP_TYPE party,    
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party
+) noexcept nogil:
+    return find_openings_in_area(
+        self,
+        self_position_buffer,
+        self_reservation_map,
+        self_occupancy_index,
+        self_packed_reservation_map,
+        party,
+        packed_party,
+        self.map_box
+    )
+
+cdef Box[::1] find_openings_in_area(
+    Reservations self,
+    DISPLAY_BUFFER_TYPE self_position_buffer,
+    DISPLAY_MAP_TYPE self_reservation_map,
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    Box origin_area
 ) noexcept nogil:
-    cdef atomic[int] pos_count
+    # openings whose origin (left, upper) lies in origin_area, in row-major order.
+    # Each band of OPENING_BLOCK_SIZE origin rows is scanned by 1 thread into its own slice of the
+    # position buffer; the slices are then merged in band order, so the result does not depend on threading.
+    # None when its buffers cannot be allocated.
     cdef Size size = from_displaymap_size(party)
-    cdef int total_positions = size_area(self.map_size)
+    cdef Box occupied_party_box = find_occupied_box(party)
+    cdef int is_solid_party = 1 if (box_width(occupied_party_box) * box_height(occupied_party_box)) == size_area(size) else 0
+    cdef int first_origin_row = max(origin_area.upper, 0)
+    cdef int first_origin_col = max(origin_area.left, 0)
+    cdef int opening_rows = min(self.map_size.height - size.height + 1, origin_area.lower) - first_origin_row
+    cdef int opening_cols = min(self.map_size.width - size.width + 1, origin_area.right) - first_origin_col
+    cdef int block_rows = 0
+    cdef int block_cols = 0
+    cdef int band_length = 0
+    cdef int* band_counts = NULL
+    cdef BlockReservation* block_reservations = NULL
+    cdef int is_allocated = 1
+    cdef int band
+    cdef int b
+    cdef int first_row
+    cdef int first_col
+    cdef int last_row
+    cdef int last_col
+    cdef int count
+    cdef BlockReservation block_reservation
     cdef int p
-    cdef Box possible_opening
     cdef int row
     cdef int col
+    cdef int total_positions = 0
     cdef Box[::1] result
-    pos_count.store(0)
+    if 0 < opening_rows and 0 < opening_cols:
+        block_rows = <int>((opening_rows + OPENING_BLOCK_SIZE - 1) / OPENING_BLOCK_SIZE)
+        block_cols = <int>((opening_cols + OPENING_BLOCK_SIZE - 1) / OPENING_BLOCK_SIZE)
+        band_length = OPENING_BLOCK_SIZE * opening_cols
+        band_counts = <int*>calloc(block_rows, sizeof(int))
+        block_reservations = <BlockReservation*>malloc(<size_t>block_rows * block_cols * sizeof(BlockReservation))
+        if band_counts == NULL or block_reservations == NULL:
+            is_allocated = 0
+            block_rows = 0
+
     with nogil, parallel(num_threads=self.num_threads):
-        for p in prange(total_positions):
-            row = <int>(p / self.map_size.width)
-            col = <int>(p - (row * self.map_size.width))
-            possible_opening = create_box(col, row, col + size.width, row + size.height)
-            if self.map_box.lower < possible_opening.lower:
-                break
-            if self.map_box.right < possible_opening.right:
-                continue
-            if 0 != _is_unreserved(
-                self,
-                self_reservation_map,
-                party,
-                possible_opening
-            ):
-                self_position_buffer[pos_count.fetch_add(1)] = p
+        for band in prange(block_rows, schedule='dynamic'):
+            count = 0
+            first_row = first_origin_row + (band * OPENING_BLOCK_SIZE)
+            last_row = min(first_row + OPENING_BLOCK_SIZE, first_origin_row + opening_rows) - 1
+            # each block of the band is tested once, its origins then visited row by row
+            for b in range(block_cols):
+                first_col = first_origin_col + (b * OPENING_BLOCK_SIZE)
+                last_col = min(first_col + OPENING_BLOCK_SIZE, first_origin_col + opening_cols) - 1
+                block_reservations[(band * block_cols) + b] = _test_block(
+                    self_occupancy_index,
+                    size,
+                    occupied_party_box,
+                    first_row,
+                    first_col,
+                    last_row,
+                    last_col
+                )
+            for row in range(first_row, last_row + 1):
+                for b in range(block_cols):
+                    block_reservation = block_reservations[(band * block_cols) + b]
+                    if BlockReservation.BLOCK_RESERVED == block_reservation:
+                        continue
+                    first_col = first_origin_col + (b * OPENING_BLOCK_SIZE)
+                    last_col = min(first_col + OPENING_BLOCK_SIZE, first_origin_col + opening_cols) - 1
+                    for col in range(first_col, last_col + 1):
+                        if BlockReservation.BLOCK_UNRESERVED == block_reservation or 0 != _can_reserve(
+                            self_occupancy_index,
+                            self_packed_reservation_map,
+                            packed_party,
+                            occupied_party_box,
+                            is_solid_party,
+                            row,
+                            col
+                        ):
+                            self_position_buffer[(band * band_length) + count] = (row * self.map_size.width) + col
+                            count = count + 1
+            band_counts[band] = count
+
+    for band in range(block_rows):
+        total_positions += band_counts[band]
 
     with gil:
-        result = create_box_array(pos_count.load())
-        for i in range(pos_count.load()):
-            p = self_position_buffer[i]
-            row = <int>(p / self.map_size.width)
-            col = <int>(p - (row * self.map_size.width))
-            result[i] = create_box(col, row, col + size.width, row + size.height)
+        if 0 == is_allocated:
+            result = None
+        else:
+            result = create_box_array(total_positions)
+            total_positions = 0
+            for band in range(block_rows):
+                for i in range(band_counts[band]):
+                    p = self_position_buffer[(band * band_length) + i]
+                    row = <int>(p / self.map_size.width)
+                    col = <int>(p - (row * self.map_size.width))
+                    result[total_positions] = create_box(col, row, col + size.width, row + size.height)
+                    total_positions += 1
 
+    free(band_counts)
+    free(block_reservations)
     return result
 
 
+cdef struct OpeningSearch:
+    int closest
+    int origin_x
+    int origin_y
+    int min_x
+    int max_x
+    int min_y
+    int max_y
+    int half_width
+    int half_height
+    int map_width
+    long long found_distance_squared
+    long long found_position
+
+cdef inline void _search_position(
+    OpeningSearch* opening_search,
+    SearchProperties* search,
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    Box occupied_party_box,
+    int is_solid_party,
+    int x,
+    int y
+) noexcept nogil:
+    # x,y is the candidate opening's box center
+    cdef long long distance_squared
+    cdef long long position
+    if x < opening_search[0].min_x or opening_search[0].max_x < x or y < opening_search[0].min_y or opening_search[0].max_y < y:
+        return
+    distance_squared = (
+        (<long long>(x - opening_search[0].origin_x) * (x - opening_search[0].origin_x))
+        + (<long long>(y - opening_search[0].origin_y) * (y - opening_search[0].origin_y))
+    )
+    position = (<long long>(y - opening_search[0].half_height) * opening_search[0].map_width) + (x - opening_search[0].half_width)
+    if -1 != opening_search[0].found_position:
+        if distance_squared == opening_search[0].found_distance_squared:
+            if opening_search[0].found_position < position:
+                return
+        elif 1 == opening_search[0].closest and opening_search[0].found_distance_squared < distance_squared:
+            return
+        elif 0 == opening_search[0].closest and distance_squared < opening_search[0].found_distance_squared:
+            return
+    if 0 == contains_search_position(search, relative_position(opening_search[0].origin_x, opening_search[0].origin_y, x, y)):
+        return
+    if 0 != _can_reserve(
+        self_occupancy_index,
+        self_packed_reservation_map,
+        packed_party,
+        occupied_party_box,
+        is_solid_party,
+        y - opening_search[0].half_height,
+        x - opening_search[0].half_width
+    ):
+        opening_search[0].found_distance_squared = distance_squared
+        opening_search[0].found_position = position
+
+cdef inline int _max_ring_distance(int origin, int lower, int upper) noexcept nogil:
+    if (origin - lower) < (upper - origin):
+        return upper - origin
+    return origin - lower
+
+cdef Box find_searched_opening(
+    Reservations self,
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    SearchProperties search
+) noexcept nogil:
+    # Visit candidate box centers in square rings around the search origin: nearest ring first for CLOSEST,
+    # farthest ring first for FARTHEST, stopping once no remaining ring can improve on the opening found.
+    # Ties go to the opening first in row-major order, matching search() over find_openings().
+    # Returns empty_box() when no opening lies in the searched relative positions.
+    cdef Size size = from_displaymap_size(party)
+    cdef Box occupied_party_box = find_occupied_box(party)
+    cdef int is_solid_party = 1 if (box_width(occupied_party_box) * box_height(occupied_party_box)) == size_area(size) else 0
+    cdef OpeningSearch opening_search
+    cdef int max_ring = 0
+    cdef int ring_index = 0
+    cdef int ring = 0
+    cdef long long ring_squared = 0
+    cdef int x = 0
+    cdef int y = 0
+
+    opening_search.closest = 1 if RelativeDistance.CLOSEST_DISTANCE == search.distance else 0
+    opening_search.origin_x = search.origin_x
+    opening_search.origin_y = search.origin_y
+    opening_search.half_width = <int>(size.width / 2)
+    opening_search.half_height = <int>(size.height / 2)
+    opening_search.min_x = opening_search.half_width
+    opening_search.max_x = self.map_size.width - size.width + opening_search.half_width
+    opening_search.min_y = opening_search.half_height
+    opening_search.max_y = self.map_size.height - size.height + opening_search.half_height
+    opening_search.map_width = self.map_size.width
+    opening_search.found_distance_squared = -1
+    opening_search.found_position = -1
+    if opening_search.max_x < opening_search.min_x or opening_search.max_y < opening_search.min_y:
+        return empty_box()
+
+    max_ring = _max_ring_distance(search.origin_x, opening_search.min_x, opening_search.max_x)
+    ring = _max_ring_distance(search.origin_y, opening_search.min_y, opening_search.max_y)
+    if max_ring < ring:
+        max_ring = ring
+
+    for ring_index in range(max_ring + 1):
+        ring = ring_index if 1 == opening_search.closest else max_ring - ring_index
+        ring_squared = <long long>ring * ring
+        if -1 != opening_search.found_position:
+            # every center on a ring is between ring and ring * sqrt(2) from the origin
+            if 1 == opening_search.closest and opening_search.found_distance_squared < ring_squared:
+                break
+            if 0 == opening_search.closest and (2 * ring_squared) < opening_search.found_distance_squared:
+                break
+        if 0 == ring:
+            _search_position(&opening_search, &search, self_occupancy_index, self_packed_reservation_map, packed_party, occupied_party_box, is_solid_party, search.origin_x, search.origin_y)
+            continue
+        for x in range(search.origin_x - ring, search.origin_x + ring + 1):
+            _search_position(&opening_search, &search, self_occupancy_index, self_packed_reservation_map, packed_party, occupied_party_box, is_solid_party, x, search.origin_y - ring)
+            _search_position(&opening_search, &search, self_occupancy_index, self_packed_reservation_map, packed_party, occupied_party_box, is_solid_party, x, search.origin_y + ring)
+        for y in range(search.origin_y - ring + 1, search.origin_y + ring):
+            _search_position(&opening_search, &search, self_occupancy_index, self_packed_reservation_map, packed_party, occupied_party_box, is_solid_party, search.origin_x - ring, y)
+            _search_position(&opening_search, &search, self_occupancy_index, self_packed_reservation_map, packed_party, occupied_party_box, is_solid_party, search.origin_x + ring, y)
+
+    if -1 == opening_search.found_position:
+        return empty_box()
+    y = <int>(opening_search.found_position / self.map_size.width)
+    x = <int>(opening_search.found_position - (<long long>y * self.map_size.width))
+    return create_box(x, y, x + size.width, y + size.height)
+
+
+cdef enum:
+    # turns of the placement spiral are SPIRAL_TURN_SPACING cells apart
+    SPIRAL_TURN_SPACING = 1
+
+cdef struct SpiralSearch:
+    int origin_x
+    int origin_y
+    int opening_rows
+    int opening_cols
+    # blocks of origins, no larger than the occupied party box so that a block shares some of it
+    int block_width
+    int block_height
+    int half_width
+    int half_height
+    int map_width
+    double radius_per_angle
+    double found_angle
+    long long found_position
+
+cdef inline double _spiral_angle(SpiralSearch* spiral_search, int x, int y) noexcept nogil:
+    # angle the spiral has turned through where it passes closest to x,y: x,y's direction from the origin,
+    # on the turn whose radius there is nearest x,y's distance from the origin
+    cdef double dx = x - spiral_search[0].origin_x
+    cdef double dy = y - spiral_search[0].origin_y
+    cdef double direction = atan2(dy, dx)
+    cdef double turns
+    if direction < 0:
+        direction = direction + (2 * M_PI)
+    turns = floor((((sqrt((dx * dx) + (dy * dy)) / spiral_search[0].radius_per_angle) - direction) / (2 * M_PI)) + 0.5)
+    if turns < 0:
+        turns = 0
+    return direction + (2 * M_PI * turns)
+
+cdef inline void _spiral_block(
+    SpiralSearch* spiral_search,
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    Size party_size,
+    Box occupied_party_box,
+    int is_solid_party,
+    int block_col,
+    int block_row
+) noexcept nogil:
+    # places the openings with their origin in the block on the spiral
+    cdef int first_row = block_row * spiral_search[0].block_height
+    cdef int first_col = block_col * spiral_search[0].block_width
+    cdef int last_row = min(first_row + spiral_search[0].block_height, spiral_search[0].opening_rows) - 1
+    cdef int last_col = min(first_col + spiral_search[0].block_width, spiral_search[0].opening_cols) - 1
+    cdef BlockReservation block_reservation = _test_block(
+        self_occupancy_index,
+        party_size,
+        occupied_party_box,
+        first_row,
+        first_col,
+        last_row,
+        last_col
+    )
+    cdef double angle
+    cdef long long position
+    cdef int row
+    cdef int col
+    if BlockReservation.BLOCK_RESERVED == block_reservation:
+        return
+    for row in range(first_row, last_row + 1):
+        for col in range(first_col, last_col + 1):
+            if BlockReservation.BLOCK_UNRESERVED != block_reservation and 0 == _can_reserve(
+                self_occupancy_index,
+                self_packed_reservation_map,
+                packed_party,
+                occupied_party_box,
+                is_solid_party,
+                row,
+                col
+            ):
+                continue
+            angle = _spiral_angle(spiral_search, col + spiral_search[0].half_width, row + spiral_search[0].half_height)
+            position = (<long long>row * spiral_search[0].map_width) + col
+            if -1 != spiral_search[0].found_position:
+                if spiral_search[0].found_angle < angle:
+                    continue
+                if angle == spiral_search[0].found_angle and spiral_search[0].found_position < position:
+                    continue
+            spiral_search[0].found_angle = angle
+            spiral_search[0].found_position = position
+
+cdef inline int _block_offset(int origin, int block_size) noexcept nogil:
+    # block column (or row) holding origin, rounding down below 0 too
+    if origin < 0:
+        return -1 - <int>((-origin - 1) / block_size)
+    return <int>(origin / block_size)
+
+cdef Box find_spiral_opening(
+    Reservations self,
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    SearchProperties search
+) noexcept nogil:
+    # The first opening along an Archimedean spiral, radius = (SPIRAL_TURN_SPACING / 2pi) * angle, out from the
+    # search origin: the one whose box center the spiral passes closest to at the least angle.
+    # Rather than stepping along the spiral, blocks of origins are visited in square rings around the search
+    # origin, rejected or accepted whole where they can be, and only openings are placed on the spiral,
+    # stopping once no remaining ring can be reached at a lesser angle.
+    # Returns empty_box() when there is no opening.
+    cdef Size size = from_displaymap_size(party)
+    cdef Box occupied_party_box = find_occupied_box(party)
+    cdef int is_solid_party = 1 if (box_width(occupied_party_box) * box_height(occupied_party_box)) == size_area(size) else 0
+    cdef SpiralSearch spiral_search
+    cdef int block_rows
+    cdef int block_cols
+    cdef int origin_block_col
+    cdef int origin_block_row
+    cdef int max_ring
+    cdef int ring
+    cdef int first
+    cdef int last
+    cdef int side
+    cdef int block_col
+    cdef int block_row
+    cdef int row
+    cdef int col
+
+    spiral_search.origin_x = search.origin_x
+    spiral_search.origin_y = search.origin_y
+    spiral_search.half_width = <int>(size.width / 2)
+    spiral_search.half_height = <int>(size.height / 2)
+    spiral_search.opening_rows = self.map_size.height - size.height + 1
+    spiral_search.opening_cols = self.map_size.width - size.width + 1
+    spiral_search.map_width = self.map_size.width
+    spiral_search.radius_per_angle = SPIRAL_TURN_SPACING / (2 * M_PI)
+    spiral_search.found_angle = -1
+    spiral_search.found_position = -1
+    spiral_search.block_width = max(min(box_width(occupied_party_box), OPENING_BLOCK_SIZE), 1)
+    spiral_search.block_height = max(min(box_height(occupied_party_box), OPENING_BLOCK_SIZE), 1)
+    if spiral_search.opening_rows <= 0 or spiral_search.opening_cols <= 0:
+        return empty_box()
+
+    block_rows = <int>((spiral_search.opening_rows + spiral_search.block_height - 1) / spiral_search.block_height)
+    block_cols = <int>((spiral_search.opening_cols + spiral_search.block_width - 1) / spiral_search.block_width)
+    origin_block_col = _block_offset(search.origin_x - spiral_search.half_width, spiral_search.block_width)
+    origin_block_row = _block_offset(search.origin_y - spiral_search.half_height, spiral_search.block_height)
+    max_ring = max(
+        max(origin_block_col, block_cols - 1 - origin_block_col),
+        max(origin_block_row, block_rows - 1 - origin_block_row)
+    )
+    for ring in range(max_ring + 1):
+        # a center in a ring's block is more than (ring - 1) blocks from the origin on one side, where the spiral
+        # is within half a turn of that distance / radius_per_angle
+        if -1 != spiral_search.found_position and (spiral_search.radius_per_angle * (spiral_search.found_angle + M_PI)) <= ((ring - 1) * min(spiral_search.block_width, spiral_search.block_height)):
+            break
+        # the ring's sides, clipped to the blocks
+        first = max(origin_block_col - ring, 0)
+        last = min(origin_block_col + ring, block_cols - 1)
+        for side in range(1 if 0 == ring else 2):
+            block_row = origin_block_row - ring if 0 == side else origin_block_row + ring
+            if block_row < 0 or block_rows <= block_row:
+                continue
+            for block_col in range(first, last + 1):
+                _spiral_block(&spiral_search, self_occupancy_index, self_packed_reservation_map, packed_party, size, occupied_party_box, is_solid_party, block_col, block_row)
+        first = max(origin_block_row - ring + 1, 0)
+        last = min(origin_block_row + ring - 1, block_rows - 1)
+        for side in range(0 if 0 == ring else 2):
+            block_col = origin_block_col - ring if 0 == side else origin_block_col + ring
+            if block_col < 0 or block_cols <= block_col:
+                continue
+            for block_row in range(first, last + 1):
+                _spiral_block(&spiral_search, self_occupancy_index, self_packed_reservation_map, packed_party, size, occupied_party_box, is_solid_party, block_col, block_row)
+
+    if -1 == spiral_search.found_position:
+        return empty_box()
+    row = <int>(spiral_search.found_position / self.map_size.width)
+    col = <int>(spiral_search.found_position - (<long long>row * self.map_size.width))
+    return create_box(col, row, col + size.width, row + size.height)
+
+
 #NOTE: PIL Image shape is of form (width, height) https://pillow.readthedocs.io/en/stable/reference/Image.html
 
 # NOTE: ND Array shape is of form: (height, width) https://numpy.org/doc/2.2/reference/generated/numpy.ndarray.shape.html
@@ -123,14 +606,48 @@ def native_find_openings(
     Reservations self, 
     DISPLAY_BUFFER_TYPE self_position_buffer,
     DISPLAY_MAP_TYPE self_reservation_map,
-    DISPLAY_MAP_TYPE party
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party
 ):
-    return find_openings(
+    cdef Box[::1] result = find_openings(
         self,
         self_position_buffer,
         self_reservation_map,
+        self_occupancy_index,
+        self_packed_reservation_map,
         party,
+        packed_party
     )
+    if result is None:
+        raise MemoryError()
+    return result
+
+
+def native_find_openings_in_area(
+    Reservations self, 
+    DISPLAY_BUFFER_TYPE self_position_buffer,
+    DISPLAY_MAP_TYPE self_reservation_map,
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    Box origin_area
+):
+    cdef Box[::1] result = find_openings_in_area(
+        self,
+        self_position_buffer,
+        self_reservation_map,
+        self_occupancy_index,
+        self_packed_reservation_map,
+        party,
+        packed_party,
+        origin_area
+    )
+    if result is None:
+        raise MemoryError()
+    return result
 
 
 def native_is_unreserved(
@@ -145,3 +662,47 @@ def native_is_unreserved(
         party,
         test_area
     )
+
+def native_find_searched_opening(
+    Reservations self,
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    SearchProperties search
+): # return native_box or None when no opening was found
+    cdef Box result
+    with nogil:
+        result = find_searched_opening(
+            self,
+            self_occupancy_index,
+            self_packed_reservation_map,
+            party,
+            packed_party,
+            search
+        )
+    if 0 != is_empty(result):
+        return None
+    return result
+
+def native_find_spiral_opening(
+    Reservations self,
+    DISPLAY_MAP_TYPE self_occupancy_index,
+    PACKED_DISPLAY_MAP_TYPE self_packed_reservation_map,
+    DISPLAY_MAP_TYPE party,
+    PACKED_DISPLAY_MAP_TYPE packed_party,
+    SearchProperties search
+): # return native_box or None when no opening was found
+    cdef Box result
+    with nogil:
+        result = find_spiral_opening(
+            self,
+            self_occupancy_index,
+            self_packed_reservation_map,
+            party,
+            packed_party,
+            search
+        )
+    if 0 != is_empty(result):
+        return None
+    return result
@@ -58,6 +58,8 @@ cdef SearchProperties start_search(
     SearchPattern pattern
 ) noexcept nogil
 
-cdef Box search(Box[::1] boxes, SearchProperties properties) noexcept nogil
+cdef Box pick(Box[::1] boxes) except * nogil
+
+cdef Box search(Box[::1] boxes, SearchProperties properties) except * nogil
 
 cdef SearchProperties next_search(Box last_found, SearchProperties last_properties) noexcept nogil
@@ -2,6 +2,7 @@
 # cython: boundscheck=False
 # cython: wraparound=False
 cimport cython
+from libc.stdlib cimport calloc, malloc, free
 from itemcloud.native.search_types cimport (
     RelativePosition,
     RelativeDistance,
@@ -298,44 +299,260 @@ cdef SearchProperties start_search(Box area, SearchPattern pattern) noexcept nog
         result.origin_y = box_center_y(result.area)
         set_search_positions(&result, RelativePosition.BOTTOM_LEFT_POSITION, RelativePosition.LEFT_POSITION, RelativePosition.TOP_LEFT_POSITION)
         result.distance = RelativeDistance.CLOSEST_DISTANCE
+    if SearchPattern.ARCHIMEDEAN_PATTERN == result.pattern:
+        # each placement walks a spiral out from the center
+        result.origin_x = box_center_x(result.area)
+        result.origin_y = box_center_y(result.area)
+        result.distance = RelativeDistance.CLOSEST_DISTANCE
     return result
 
 
-cdef Box search(Box[::1] boxes, SearchProperties properties) noexcept nogil:
+cdef enum:
+    # box centers are bucketed into cells at least 1 << SEARCH_CELL_SHIFT wide and tall,
+    # wider when boxes are so spread out that there would be more than SEARCH_CELLS_PER_BOX cells per box
+    SEARCH_CELL_SHIFT = 5
+    SEARCH_CELLS_PER_BOX = 4
+
+cdef struct SearchGrid:
+    # cell (column, row) holds the centers from min_x + column * cell_size and min_y + row * cell_size.
+    # Its boxes, in boxes order, are indexes[cell_starts[cell] .. cell_starts[cell + 1]], cell = row * columns + column
+    int min_x
+    int min_y
+    int cell_shift
+    int cell_size
+    int columns
+    int rows
+    int* cell_starts
+    int* indexes
+
+cdef SearchGrid create_search_grid(Box[::1] boxes) noexcept nogil:
+    # boxes must not be empty, search checks them first.
+    # the grid's cell_starts and indexes are NULL when it cannot be allocated
+    cdef SearchGrid grid
+    cdef int max_x = box_center_x(boxes[0])
+    cdef int max_y = box_center_y(boxes[0])
+    cdef int* box_cells = NULL
+    cdef int cell
+    cdef int x
+    cdef int y
+    cdef int i
+    grid.min_x = max_x
+    grid.min_y = max_y
+    for i in range(1, boxes.shape[0]):
+        x = box_center_x(boxes[i])
+        y = box_center_y(boxes[i])
+        if x < grid.min_x:
+            grid.min_x = x
+        elif max_x < x:
+            max_x = x
+        if y < grid.min_y:
+            grid.min_y = y
+        elif max_y < y:
+            max_y = y
+    grid.cell_shift = SEARCH_CELL_SHIFT
+    while True:
+        grid.columns = ((max_x - grid.min_x) >> grid.cell_shift) + 1
+        grid.rows = ((max_y - grid.min_y) >> grid.cell_shift) + 1
+        if (<long long>grid.columns * grid.rows) <= (<long long>boxes.shape[0] * SEARCH_CELLS_PER_BOX):
+            break
+        grid.cell_shift += 1
+    grid.cell_size = 1 << grid.cell_shift
+    box_cells = <int*>malloc(boxes.shape[0] * sizeof(int))
+    grid.cell_starts = <int*>calloc((grid.columns * grid.rows) + 1, sizeof(int))
+    grid.indexes = <int*>malloc(boxes.shape[0] * sizeof(int))
+    if box_cells == NULL or grid.cell_starts == NULL or grid.indexes == NULL:
+        free(box_cells)
+        free(grid.cell_starts)
+        free(grid.indexes)
+        grid.cell_starts = NULL
+        grid.indexes = NULL
+        return grid
+    for i in range(boxes.shape[0]):
+        box_cells[i] = (
+            (((box_center_y(boxes[i]) - grid.min_y) >> grid.cell_shift) * grid.columns)
+            + ((box_center_x(boxes[i]) - grid.min_x) >> grid.cell_shift)
+        )
+        grid.cell_starts[box_cells[i] + 1] += 1
+    for cell in range(grid.columns * grid.rows):
+        grid.cell_starts[cell + 1] += grid.cell_starts[cell]
+    # cell_starts[cell + 1] is where cell ends. Filling each cell from its end back, walking boxes backwards to
+    # keep them in boxes order, leaves it where cell starts.
+    for i in range(boxes.shape[0] - 1, -1, -1):
+        grid.cell_starts[box_cells[i] + 1] -= 1
+        grid.indexes[grid.cell_starts[box_cells[i] + 1]] = i
+    for cell in range(grid.columns * grid.rows):
+        grid.cell_starts[cell] = grid.cell_starts[cell + 1]
+    grid.cell_starts[grid.columns * grid.rows] = boxes.shape[0]
+    free(box_cells)
+    return grid
+
+cdef void free_search_grid(SearchGrid* grid) noexcept nogil:
+    free(grid[0].cell_starts)
+    free(grid[0].indexes)
+
+cdef inline int _cell_offset(SearchGrid* grid, int origin, int grid_min) noexcept nogil:
+    # cell column (or row) holding origin, which may lie off the grid. Shifting rounds down, below grid_min too.
+    return (origin - grid_min) >> grid[0].cell_shift
+
+cdef RelativePosition _cell_position(SearchGrid* grid, SearchProperties* properties, int column, int row) noexcept nogil:
+    # the relative position every center in the cell shares, NO_POSITION when they do not all share one
+    cdef int first_x = grid[0].min_x + (column * grid[0].cell_size)
+    cdef int first_y = grid[0].min_y + (row * grid[0].cell_size)
+    if first_x <= properties[0].origin_x and properties[0].origin_x < first_x + grid[0].cell_size:
+        return RelativePosition.NO_POSITION
+    if first_y <= properties[0].origin_y and properties[0].origin_y < first_y + grid[0].cell_size:
+        return RelativePosition.NO_POSITION
+    return relative_position(properties[0].origin_x, properties[0].origin_y, first_x, first_y)
+
+cdef int _search_cell_distance(
+    SearchGrid* grid,
+    Box[::1] boxes,
+    SearchProperties* properties,
+    int column,
+    int row,
+    int index,
+    long long* found_distance_squared
+) noexcept nogil:
+    # index of the box closest (or farthest) from the origin among index and the cell's boxes in the searched
+    # positions, ties going to the lower index
+    cdef int cell = (row * grid[0].columns) + column
+    cdef RelativePosition cell_position = _cell_position(grid, properties, column, row)
+    cdef int closest = 1 if RelativeDistance.CLOSEST_DISTANCE == properties[0].distance else 0
+    cdef long long distance_squared
+    cdef int x
+    cdef int y
+    cdef int c
+    cdef int i
+    if RelativePosition.NO_POSITION != cell_position and 0 == contains_search_position(properties, cell_position):
+        return index
+    for c in range(grid[0].cell_starts[cell], grid[0].cell_starts[cell + 1]):
+        i = grid[0].indexes[c]
+        x = box_center_x(boxes[i])
+        y = box_center_y(boxes[i])
+        if RelativePosition.NO_POSITION == cell_position and 0 == contains_search_position(properties, relative_position(properties[0].origin_x, properties[0].origin_y, x, y)):
+            continue
+        distance_squared = (
+            (<long long>(x - properties[0].origin_x) * (x - properties[0].origin_x))
+            + (<long long>(y - properties[0].origin_y) * (y - properties[0].origin_y))
+        )
+        if -1 != index:
+            if distance_squared == found_distance_squared[0]:
+                if index < i:
+                    continue
+            elif 1 == closest and found_distance_squared[0] < distance_squared:
+                continue
+            elif 0 == closest and distance_squared < found_distance_squared[0]:
+                continue
+        index = i
+        found_distance_squared[0] = distance_squared
+    return index
+
+cdef int _search_grid_distance(SearchGrid* grid, Box[::1] boxes, SearchProperties* properties) noexcept nogil:
+    # Visit cells in square rings around the origin's cell: nearest ring first for CLOSEST, farthest ring first
+    # for FARTHEST, stopping once no remaining ring can improve on the box found. -1 when none is in the positions.
+    cdef int closest = 1 if RelativeDistance.CLOSEST_DISTANCE == properties[0].distance else 0
+    cdef int origin_column = _cell_offset(grid, properties[0].origin_x, grid[0].min_x)
+    cdef int origin_row = _cell_offset(grid, properties[0].origin_y, grid[0].min_y)
+    cdef int max_ring = max(
+        max(origin_column, grid[0].columns - 1 - origin_column),
+        max(origin_row, grid[0].rows - 1 - origin_row)
+    )
+    cdef long long found_distance_squared = -1
+    cdef long long ring_distance
     cdef int index = -1
+    cdef int ring_index
+    cdef int ring
+    cdef int column
+    cdef int row
+    for ring_index in range(max_ring + 1):
+        ring = ring_index if 1 == closest else max_ring - ring_index
+        if -1 != index:
+            # a center in a ring's cell is more than (ring - 1) cells, and less than (ring + 1) cells on each side, away
+            ring_distance = <long long>(ring - 1) * grid[0].cell_size
+            if 1 == closest and 0 < ring and found_distance_squared <= ring_distance * ring_distance:
+                break
+            ring_distance = <long long>(ring + 1) * grid[0].cell_size
+            if 0 == closest and (2 * ring_distance * ring_distance) <= found_distance_squared:
+                break
+        for row in range(max(origin_row - ring, 0), min(origin_row + ring, grid[0].rows - 1) + 1):
+            if row == origin_row - ring or row == origin_row + ring:
+                for column in range(max(origin_column - ring, 0), min(origin_column + ring, grid[0].columns - 1) + 1):
+                    index = _search_cell_distance(grid, boxes, properties, column, row, index, &found_distance_squared)
+                continue
+            if 0 <= origin_column - ring and origin_column - ring < grid[0].columns:
+                index = _search_cell_distance(grid, boxes, properties, origin_column - ring, row, index, &found_distance_squared)
+            if 0 < ring and 0 <= origin_column + ring and origin_column + ring < grid[0].columns:
+                index = _search_cell_distance(grid, boxes, properties, origin_column + ring, row, index, &found_distance_squared)
+    return index
+
+cdef int _search_grid_random(SearchGrid* grid, Box[::1] boxes, SearchProperties* properties) noexcept nogil:
+    # a random box, in cell order, of those in the searched positions. -1 when none is.
+    # Cells whose centers all share a relative position are counted whole.
     cdef int total_at_position = 0
-    cdef int randomly_selected_position = 0
+    cdef int randomly_selected_position
+    cdef RelativePosition cell_position
+    cdef int cell
+    cdef int column
+    cdef int row
+    cdef int c
     cdef int i
+    for row in range(grid[0].rows):
+        for column in range(grid[0].columns):
+            cell = (row * grid[0].columns) + column
+            cell_position = _cell_position(grid, properties, column, row)
+            if RelativePosition.NO_POSITION != cell_position:
+                if 0 < contains_search_position(properties, cell_position):
+                    total_at_position += grid[0].cell_starts[cell + 1] - grid[0].cell_starts[cell]
+                continue
+            for c in range(grid[0].cell_starts[cell], grid[0].cell_starts[cell + 1]):
+                if 0 < contains_search_position(properties, box_relative_position(properties[0].origin_x, properties[0].origin_y, boxes[grid[0].indexes[c]])):
+                    total_at_position += 1
+    if 0 == total_at_position:
+        return -1
+    randomly_selected_position = randindex(total_at_position)
+    for row in range(grid[0].rows):
+        for column in range(grid[0].columns):
+            cell = (row * grid[0].columns) + column
+            cell_position = _cell_position(grid, properties, column, row)
+            if RelativePosition.NO_POSITION != cell_position:
+                if 0 < contains_search_position(properties, cell_position):
+                    if randomly_selected_position < grid[0].cell_starts[cell + 1] - grid[0].cell_starts[cell]:
+                        return grid[0].indexes[grid[0].cell_starts[cell] + randomly_selected_position]
+                    randomly_selected_position -= grid[0].cell_starts[cell + 1] - grid[0].cell_starts[cell]
+                continue
+            for c in range(grid[0].cell_starts[cell], grid[0].cell_starts[cell + 1]):
+                i = grid[0].indexes[c]
+                if 0 < contains_search_position(properties, box_relative_position(properties[0].origin_x, properties[0].origin_y, boxes[i])):
+                    if 0 == randomly_selected_position:
+                        return i
+                    randomly_selected_position -= 1
+    return -1
+
+cdef Box pick(Box[::1] boxes) except * nogil:
+    if 0 == boxes.shape[0]:
+        with gil:
+            raise ValueError('no boxes to pick from')
+    return boxes[randindex(boxes.shape[0])]
+
+cdef Box search(Box[::1] boxes, SearchProperties properties) except * nogil:
+    # boxes are bucketed by center into a SearchGrid, so only the cells that can hold the box searched for are visited
+    cdef int index = -1
+    cdef SearchGrid grid
+    if 0 == boxes.shape[0]:
+        with gil:
+            raise ValueError('no boxes to search')
     if SearchPattern.NO_PATTERN == properties.pattern:
-        return boxes[randindex(boxes.shape[0])]
+        return pick(boxes)
 
+    grid = create_search_grid(boxes)
+    if grid.indexes == NULL:
+        with gil:
+            raise MemoryError()
     if RelativeDistance.RANDOM_DISTANCE == properties.distance:
-        for i in range(boxes.shape[0]):
-            if 0 < contains_search_position(&properties, box_relative_position(properties.origin_x, properties.origin_y, boxes[i])):
-                total_at_position = total_at_position + 1
-        if 0 < total_at_position:
-            randomly_selected_position = randindex(total_at_position)
-            total_at_position = 0
-            for i in range(boxes.shape[0]):
-                if 0 < contains_search_position(&properties, box_relative_position(properties.origin_x, properties.origin_y, boxes[i])):
-                    if randomly_selected_position == total_at_position:
-                        index = i
-                        break
-                    total_at_position = total_at_position + 1
-
-    if RelativeDistance.CLOSEST_DISTANCE == properties.distance:
-        for i in range(boxes.shape[0]):
-            if 0 < contains_search_position(&properties, box_relative_position(properties.origin_x, properties.origin_y, boxes[i])):
-                if 0 == total_at_position or origin_distance(properties.origin_x, properties.origin_y, boxes[i]) < origin_distance(properties.origin_x, properties.origin_y, boxes[index]):
-                    index = i
-                total_at_position = total_at_position + 1
-
-    if RelativeDistance.FARTHEST_DISTANCE == properties.distance:
-        for i in range(boxes.shape[0]):
-            if 0 < contains_search_position(&properties, box_relative_position(properties.origin_x, properties.origin_y, boxes[i])):
-                if 0 == total_at_position or origin_distance(properties.origin_x, properties.origin_y, boxes[i]) > origin_distance(properties.origin_x, properties.origin_y, boxes[index]):
-                    index = i
-                total_at_position = total_at_position + 1
+        index = _search_grid_random(&grid, boxes, &properties)
+    else:
+        index = _search_grid_distance(&grid, boxes, &properties)
+    free_search_grid(&grid)
 
     if -1 == index:
         index = randindex(boxes.shape[0])
@@ -351,14 +568,17 @@ cdef SearchProperties next_search(Box last_found, SearchProperties last_properti
     return start_search(last_properties.area, last_properties.pattern)
 
 cdef SearchPattern str_to_pattern(str pattern):
-    if pattern == 'RANDOM_PATTERN':
+    # pattern is a SearchPattern name, as python's search_types names them
+    if pattern == 'RANDOM':
         return SearchPattern.RANDOM_PATTERN
-    if pattern == 'LINEAR_PATTERN':
+    if pattern == 'LINEAR':
         return SearchPattern.LINEAR_PATTERN
-    if pattern == 'RAY_PATTERN':
+    if pattern == 'RAY':
         return SearchPattern.RAY_PATTERN
-    if pattern == 'SPIRAL_PATTERN':
+    if pattern == 'SPIRAL':
         return SearchPattern.SPIRAL_PATTERN
+    if pattern == 'ARCHIMEDEAN':
+        return SearchPattern.ARCHIMEDEAN_PATTERN
     return SearchPattern.NO_PATTERN
 
 def native_start_search(
@@ -373,6 +593,9 @@ def native_start_search(
 def native_search(boxes: Box[::1], properties: SearchProperties): # return native_box
     return search(boxes, properties)
 
+def native_pick(boxes: Box[::1]): # return native_box
+    return pick(boxes)
+
 def native_next_search(
     last_found: Box,
     last_properties: SearchProperties
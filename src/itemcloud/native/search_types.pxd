@@ -25,6 +25,7 @@ cdef enum SearchPattern:
     LINEAR_PATTERN = 2
     RAY_PATTERN = 3
     SPIRAL_PATTERN = 4
+    ARCHIMEDEAN_PATTERN = 5
 
 cdef RelativePosition randpos() noexcept nogil
 cdef SearchPattern randpattern() noexcept nogil
\ No newline at end of file
@@ -1,28 +1,87 @@
-from typing import List
-from itemcloud.size import (Size, ResizeType)
+import numpy as np
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Tuple
+from itemcloud.size import (Size, ResizeType, SizingType)
 from itemcloud.box import (
     Box,
+    BOX_ARRAY_TYPE,
     Direction,
-    from_native_box_array,
-    RotateDirection
+    RotateDirection,
+    to_box_array
 )
 from itemcloud.native.reservations import (
     native_create_reservations,
-    native_find_openings
+    native_find_openings,
+    native_find_openings_in_area,
+    native_find_searched_opening,
+    native_find_spiral_opening
 )
+from itemcloud.native.math import native_seed_thread_random
 from itemcloud.logger.base_logger import BaseLogger
 from itemcloud.util.search import SearchProperties
 from itemcloud.util.display_map import(
     create_display_buffer,
     create_display_map,
+    create_occupancy_index,
+    write_occupancy_index,
+    create_packed_display_map,
+    write_packed_display_map,
+    to_packed_display_map,
+    to_fft_shape,
+    to_display_map_spectrum,
+    correlate_display_map,
     DISPLAY_MAP_TYPE,
+    DISPLAY_BUFFER_TYPE,
+    DISPLAY_MAP_SIZE_TYPE,
+    PACKED_DISPLAY_MAP_TYPE,
     add_margin_to_display_map,
     write_display_map,
-    can_fit_on_target,
-    from_displaymap_box
+    can_fit_runs_on_target,
+    find_occupied_box,
+    from_displaymap_box,
+    from_displaymap_size
 )
+from itemcloud.util.free_rectangles import FreeRectangles
+from itemcloud.util.tiled_display_map import TiledDisplayMap
+from itemcloud.util.random import is_random_seeded, next_random_seed
 from itemcloud.util.time_measure import TimeMeasure
 from itemcloud.containers.base.item import Item
+from itemcloud.containers.base.placement_item import to_placement_item, to_materialized_item
+
+# parties at least this large, and not fully occupied, find all openings by fft correlation
+# fully occupied parties are decided per opening in O(1) by the occupancy index, at any size
+CORRELATION_MIN_PARTY_AREA = 128 * 128
+# valid origins are kept for this many of the most recently searched parties, keyed on the party map's id and
+# dropped with it. Party maps are the shared margined maps, so a party searched again is the same map.
+OPENINGS_CACHE_CAPACITY = 16
+
+# (rows, cols) of opening origins, the upper left corner of each opening
+OPENING_ORIGINS_TYPE = Tuple[np.ndarray, np.ndarray]
+
+def to_native_openings_origins(native_openings) -> OPENING_ORIGINS_TYPE:
+    # native openings are (left, upper, right, lower) int boxes
+    openings = np.asarray(native_openings).view(np.int32).reshape(-1, 4)
+    return (openings[:, 1], openings[:, 0])
+
+def gallop_to_last_fit(fits: Callable[[int], bool], limit: int | None = None) -> int:
+    # largest distance fits, up to limit, trying 1, 2, 4 .. until one does not fit and bisecting back, 0 when 1 does not fit.
+    # Without a limit fits must stop fitting at some distance. Only the returned distance is sure to fit, past the first
+    # one that does not fit is never tried, and between the tried ones it is assumed that fitting stops at most once.
+    last_fit = 0
+    distance = 1 if limit is None else min(1, limit)
+    while last_fit < distance and fits(distance):
+        last_fit = distance
+        distance = distance * 2 if limit is None else min(distance * 2, limit)
+    while 1 < (distance - last_fit):
+        middle = (last_fit + distance) // 2
+        if fits(middle):
+            last_fit = middle
+        else:
+            distance = middle
+    return last_fit
 
 class Reservation:
     def __init__(self, name: str, no: int, box: Box, item: Item):
@@ -32,6 +91,40 @@ class Reservation:
         self.reservation_party = item
 
 
+class CachedOpenings(object):
+    def __init__(self, origins: np.ndarray, reservation_total: int, finalizer: weakref.finalize):
+        # origins[row, col] is True when the party fits with its upper left at (col, row)
+        self.origins = origins
+        # reservations made before origins was last brought up to date
+        self.reservation_total = reservation_total
+        # drops the entry when the party map is freed, detached when the entry is evicted first
+        self.finalizer = finalizer
+
+
+class NoFitFrontier(object):
+    # (width, height) of solid parties that fit nowhere, keeping only those no other is narrower and shorter than.
+    # Reservations only fill the map, so a party holding a solid box at least that wide and tall fits nowhere either.
+    def __init__(self):
+        self._failed_sizes: List[Tuple[int, int]] = list()
+        self._lock = threading.Lock()
+
+    def add(self, width: int, height: int) -> None:
+        with self._lock:
+            if self.excludes(width, height):
+                return
+            self._failed_sizes = [
+                (failed_width, failed_height) for failed_width, failed_height in self._failed_sizes
+                if not(width <= failed_width and height <= failed_height)
+            ]
+            self._failed_sizes.append((width, height))
+
+    def excludes(self, width: int, height: int) -> bool:
+        return any(
+            failed_width <= width and failed_height <= height
+            for failed_width, failed_height in self._failed_sizes
+        )
+
+
 class SampledUnreservedOpening(object):
     found: bool = False
     sampling_total: int = 0
@@ -59,7 +152,8 @@ class Reservations(object):
     def __init__(self,
                  logger: BaseLogger,
                  map_size: Size = Size(0,0),
-                 total_threads: int = 1
+                 total_threads: int = 1,
+                 tiled_reservation_map: bool = False
         ):
         self.logger = logger
         self.num_threads = total_threads
@@ -71,6 +165,13 @@ class Reservations(object):
 #       PIL Image shape is of form (width, height) https://pillow.readthedocs.io/en/stable/reference/Image.html
 
         self._reservation_map = create_display_map(self._map_size)
+        self._occupancy_index = create_occupancy_index(self._map_size)
+        self._packed_reservation_map = create_packed_display_map(self._map_size)
+        # a tiled copy of the reservation map, when fit tests read it instead
+        self._tiled_reservation_map = TiledDisplayMap(self._map_size) if tiled_reservation_map else None
+        self._reservation_spectrums: Dict[DISPLAY_MAP_SIZE_TYPE, np.ndarray] = dict()
+        self._free_rectangles = FreeRectangles(self._map_box)
+        self._openings_cache: OrderedDict[int, CachedOpenings] = OrderedDict()
         self._position_buffer = create_display_buffer(self._buffer_length)
         self._native_reservations = native_create_reservations(
             self.num_threads,
@@ -78,6 +179,13 @@ class Reservations(object):
             self._map_box.to_native(),
             self._buffer_length,
         )
+        self._openings_lock = threading.Lock()
+        self._concurrent_scans = threading.local()
+        self._scan_executor: ThreadPoolExecutor | None = None
+        self._no_fit_frontier = NoFitFrontier()
+        # unoccupied cells of the map, in all and by row
+        self._free_total = self._map_size.area
+        self._free_row_counts = np.full(self._map_size.height, self._map_size.width, dtype=np.int64)
 
     @property
     def reservation_map(self) -> DISPLAY_MAP_TYPE:
@@ -95,7 +203,15 @@ class Reservations(object):
             ))
             return False
         self.logger.debug("RESERVED: reserve_opening reservation({0}) opening{1}".format(reservation_no, opening.box_to_string()))
-        write_display_map(add_margin_to_display_map(party.display_map, margin), self._reservation_map, opening, reservation_no)
+        party_map = add_margin_to_display_map(party.display_map, margin)
+        write_display_map(party_map, self._reservation_map, opening, reservation_no)
+        self._free_rectangles.reserve(party_map, opening)
+        write_occupancy_index(self._reservation_map, self._occupancy_index, opening)
+        self._count_free_cells(opening.upper, opening.lower)
+        write_packed_display_map(self._reservation_map, self._packed_reservation_map, opening)
+        if self._tiled_reservation_map is not None:
+            self._tiled_reservation_map.write(party_map, opening, reservation_no)
+        self._reservation_spectrums.clear()
         self._reservations.append(Reservation(name, reservation_no, opening, party))
         return True
 
@@ -107,8 +223,70 @@ class Reservations(object):
         resize_type: ResizeType,
         step_size: int,
         rotation_increment: int,
-        search_properties: SearchProperties
+        search_properties: SearchProperties,
+        sizing_type: SizingType = SizingType.LINEAR
+    ) -> SampledUnreservedOpening:
+        # Sizes and rotations are searched with a placement stand in for item, rendering only the one that fits.
+        # Should the rendered item not fit where its stand in did, nor anywhere else, item itself is searched.
+        result = self._sample_to_find_unreserved_opening(
+            to_placement_item(item),
+            min_party_size,
+            margin,
+            resize_type,
+            step_size,
+            rotation_increment,
+            search_properties,
+            sizing_type
+        )
+        if result.found and not(self._materialize_opening(result, margin, search_properties)):
+            self.logger.debug(f"Rendered {result.new_item.size_to_string()} did not fit as placed, searching item")
+            result = self._sample_to_find_unreserved_opening(
+                to_materialized_item(item),
+                min_party_size,
+                margin,
+                resize_type,
+                step_size,
+                rotation_increment,
+                search_properties,
+                sizing_type
+            )
+        return result
+
+    def _materialize_opening(self, result: SampledUnreservedOpening, margin: int, search_properties: SearchProperties) -> bool:
+        # swap result's placement item for the rendered item, moving the opening when the rendered item does not fit in it
+        new_item = to_materialized_item(result.new_item)
+        new_item_map = add_margin_to_display_map(new_item.display_map, margin)
+        opening = result.opening_box
+        if not(new_item_map.shape == (opening.height, opening.width) and self._can_fit_on_reservation_map(new_item_map, opening)):
+            opening = self._find_unreserved_opening(new_item_map, search_properties)
+            if opening is None:
+                return False
+            result.opening_box = opening
+            result.actual_box = opening.remove_margin(margin)
+        result.new_item = new_item
+        return True
+
+    def _sample_to_find_unreserved_opening(
+        self,
+        item: Item,
+        min_party_size: Size,
+        margin: int,
+        resize_type: ResizeType,
+        step_size: int,
+        rotation_increment: int,
+        search_properties: SearchProperties,
+        sizing_type: SizingType
     ) -> SampledUnreservedOpening:
+        if SizingType.GALLOPING == sizing_type:
+            return self._gallop_to_find_unreserved_opening(
+                item,
+                min_party_size,
+                margin,
+                resize_type,
+                step_size,
+                rotation_increment,
+                search_properties
+            )
         result: SampledUnreservedOpening = SampledUnreservedOpening()
         shrink_step_size: int = -step_size
         rotate: bool = False
@@ -116,45 +294,180 @@ class Reservations(object):
         result.new_item = item
         unrotated_item: Item = item
         result.measure.start()
+        # Cycle: search -> shrink -> (search -> rotate)[until found or rotated 360] -> do cycle again with new shrink
+        # until found or shrank so small its below min size -> not found
         while True:
-            result.sampling_total += 1
-            party = add_margin_to_display_map(result.new_item.display_map, margin)
-            openings = self._find_unreserved_openings(party)            
-            result.found = 0 < len(openings)
+            fit = self._sample_rotations(result, unrotated_item, margin, rotation_increment if rotate else 0, search_properties)
+            if fit is not None:
+                result.found = True
+                result.new_item = fit.new_item
+                result.rotated_degrees = fit.rotated_degrees
+                result.opening_box = fit.opening_box
+                result.actual_box = fit.actual_box
+                result.measure.stop()
+                result.log_finding(self.logger)
+                return result
+
+            # cycle part search -> shrink
+            result.new_item = unrotated_item
+            result.rotated_degrees = 0
+            new_size = result.new_item.adjust(shrink_step_size, resize_type)
+            result.new_item = result.new_item.resize_item(new_size)
 
-            if result.found:
-                result.opening_box = search_properties.search(openings)
-                result.actual_box = result.opening_box.remove_margin(margin)
+            if result.new_item.is_less_than(min_party_size):
                 result.measure.stop()
                 result.log_finding(self.logger)
                 return result
 
-            result.log_sampling(self.logger)
+            unrotated_item = result.new_item
+            rotate = True
 
-            # Cycle: search -> shrink -> (search -> rotate)[until found or rotated 360] -> do cycle again with new shrink
-            # until found or shrank so small its below min size -> not found
-            if rotate and 0 < rotation_increment:
-                # cycle part: (search -> rotate)[until found or rotated 360]
-                result.rotated_degrees += rotation_increment
-                result.new_item = unrotated_item.rotate_item(result.rotated_degrees, RotateDirection.CLOCKWISE)
-                if 360 <= (result.rotated_degrees + rotation_increment):
-                    rotate = False
-            else:
-                # cycle part search -> shrink
-                result.new_item = unrotated_item
-                result.rotated_degrees = 0
-                new_size = result.new_item.adjust(shrink_step_size, resize_type)
-                result.new_item = result.new_item.resize_item(new_size)
+    def _gallop_to_find_unreserved_opening(
+        self,
+        item: Item,
+        min_party_size: Size,
+        margin: int,
+        resize_type: ResizeType,
+        step_size: int,
+        rotation_increment: int,
+        search_properties: SearchProperties
+    ) -> SampledUnreservedOpening:
+        # Shrinks are counted in steps of step_size, as the linear cycle takes them, but tried 1, 2, 4, 8 .. steps
+        # down until one fits, then bisected back to the fewest steps that fit. Each size is searched
+        # (and rotated) as in the linear cycle, so this assumes an item that fits still fits once smaller.
+        result: SampledUnreservedOpening = SampledUnreservedOpening()
+        result.original_item = item
+        result.new_item = item
+        result.measure.start()
+        sizes: List[Size] = [item.item_size]
+        fits: Dict[int, SampledUnreservedOpening] = dict()
+
+        def last_step(step: int) -> int:
+            # the furthest shrink up to step that is not below min_party_size
+            while len(sizes) <= step:
+                new_size = sizes[-1].adjust(-step_size, resize_type)
+                if new_size.is_less_than(min_party_size) or new_size.is_equal(sizes[-1]):
+                    break
+                sizes.append(new_size)
+            return min(step, len(sizes) - 1)
 
-                if result.new_item.is_less_than(min_party_size):
-                    result.measure.stop()
-                    result.log_finding(self.logger)
-                    return result
+        def fits_at(step: int) -> bool:
+            sized_item = item if 0 == step else item.resize_item(sizes[step])
+            fit = self._sample_rotations(result, sized_item, margin, rotation_increment if 0 < step else 0, search_properties)
+            if fit is not None:
+                fits[step] = fit
+            return fit is not None
 
-                unrotated_item = result.new_item
-                rotate = True
+        if not(fits_at(0)):
+            failed_step = 0
+            fit_step = None
+            gallop = 1
+            while fit_step is None:
+                step = last_step(failed_step + gallop)
+                if step <= failed_step:
+                    break
+                if fits_at(step):
+                    fit_step = step
+                else:
+                    failed_step = step
+                gallop *= 2
+            if fit_step is None:
+                result.measure.stop()
+                result.log_finding(self.logger)
+                return result
+            while 1 < (fit_step - failed_step):
+                step = (failed_step + fit_step) // 2
+                if fits_at(step):
+                    fit_step = step
+                else:
+                    failed_step = step
+        else:
+            fit_step = 0
+
+        fit = fits[fit_step]
+        result.found = True
+        result.new_item = fit.new_item
+        result.rotated_degrees = fit.rotated_degrees
+        result.opening_box = fit.opening_box
+        result.actual_box = fit.actual_box
+        result.measure.stop()
+        result.log_finding(self.logger)
+        return result
 
-    def maximize_existing_reservation(self, reservation: Reservation, margin: int, maximize_type: ResizeType) -> Reservation:
+    def _sample_rotations(
+        self,
+        result: SampledUnreservedOpening,
+        item: Item,
+        margin: int,
+        rotation_increment: int,
+        search_properties: SearchProperties
+    ) -> SampledUnreservedOpening | None:
+        # search item, then item rotated by each rotation_increment short of 360, counting samplings in result.
+        # With more than 1 thread the angles are searched concurrently; the first angle, in that order, to fit wins.
+        # When seeded, each angle draws from its own seed so the picks do not depend on which thread searched it.
+        angles = [0]
+        if 0 < rotation_increment:
+            angles.extend(range(rotation_increment, 360, rotation_increment))
+        angles_seed = next_random_seed() if is_random_seeded() else None
+
+        def rotate_angle(angle: int) -> SampledUnreservedOpening:
+            sample = SampledUnreservedOpening()
+            sample.new_item = item if 0 == angle else item.rotate_item(angle, RotateDirection.CLOCKWISE)
+            sample.rotated_degrees = angle
+            return sample
+
+        def search_angle(sample: SampledUnreservedOpening, party: DISPLAY_MAP_TYPE) -> SampledUnreservedOpening:
+            if angles_seed is not None:
+                native_seed_thread_random(angles_seed + sample.rotated_degrees)
+            opening = self._find_unreserved_opening(party, search_properties)
+            if opening is not None:
+                sample.found = True
+                sample.opening_box = opening
+                sample.actual_box = opening.remove_margin(margin)
+            return sample
+
+        def log_sample(sample: SampledUnreservedOpening) -> None:
+            result.sampling_total += 1
+            result.new_item = sample.new_item
+            result.rotated_degrees = sample.rotated_degrees
+            if not(sample.found):
+                result.log_sampling(self.logger)
+
+        if 1 == len(angles) or self.num_threads <= 1:
+            for angle in angles:
+                sample = rotate_angle(angle)
+                sample = search_angle(sample, add_margin_to_display_map(sample.new_item.display_map, margin))
+                log_sample(sample)
+                if sample.found:
+                    return sample
+            return None
+
+        # rotating (rendering text) holds the GIL, so it is done here and only the scans run side by side
+        executor = self._concurrent_scan_executor()
+        samplings = list()
+        for angle in angles:
+            sample = rotate_angle(angle)
+            samplings.append(executor.submit(search_angle, sample, add_margin_to_display_map(sample.new_item.display_map, margin)))
+        for index in range(len(samplings)):
+            sample = samplings[index].result()
+            log_sample(sample)
+            if sample.found:
+                # later angles already searching finish before the caller reserves the opening
+                for later_sampling in samplings[index + 1:]:
+                    later_sampling.cancel()
+                wait(samplings[index + 1:])
+                return sample
+        return None
+
+    def maximize_existing_reservation(
+        self,
+        reservation: Reservation,
+        margin: int,
+        maximize_type: ResizeType,
+        sizing_type: SizingType = SizingType.LINEAR
+    ) -> Reservation:
+        if SizingType.GALLOPING == sizing_type:
+            return self._gallop_to_maximize_existing_reservation(reservation, margin, maximize_type)
         reservations_map = self._reservation_map
         reservations_box = from_displaymap_box(reservations_map.shape)
         expanded_item = reservation.reservation_party
@@ -174,9 +487,8 @@ class Reservations(object):
                     if not(reservations_box.contains(sliding_reservation_box)):
                         deadends.add(direction)
                         continue
-                    if not(can_fit_on_target(
+                    if not(self._can_fit_on_reservation_map(
                         expanded_item_map,
-                        reservations_map,
                         sliding_reservation_box,
                         reservation.reservation_no
                     )):
@@ -203,9 +515,8 @@ class Reservations(object):
                         continue
                     new_item = expanded_item.resize_item(new_reservation.remove_margin(margin).size)
                     new_item_map = add_margin_to_display_map(new_item.display_map, margin)
-                    if not(can_fit_on_target(
+                    if not(self._can_fit_on_reservation_map(
                         new_item_map,
-                        reservations_map,
                         new_reservation,
                         reservation.reservation_no
                     )):
@@ -225,28 +536,376 @@ class Reservations(object):
             expanded_item
         )
 
-    
+    def _gallop_to_maximize_existing_reservation(self, reservation: Reservation, margin: int, maximize_type: ResizeType) -> Reservation:
+        # Grows in the linear expansion's order, but each growth tries 1, 2, 4 .. cells until it collides and then
+        # bisects back to the most that fits.
+        # Keeping aspect, the first corner that fits grows, and the corners are tried again from the first, as linear does.
+        # Without resizing, linear grows every direction 1 cell a round. Here every direction gets a turn each round
+        # too, growing at most round_limit cells, which doubles each round. So no direction runs ahead of the others
+        # by more than the growth of the round before, and which takes contested cells mostly follows linear.
+        # Results can still differ from linear's. A stretched map does not have to stop fitting once it does not fit,
+        # and galloping trusts the distances it skipped.
+        reservations_map = self._reservation_map
+        reservations_box = from_displaymap_box(reservations_map.shape)
+        expanded_item = reservation.reservation_party
+        expanded_reservation = reservation.reservation_box.copy_box()
+        deadends = set()
+        deadends.add(Direction.NO_DIRECTION)
+        corners: List[Callable[[Box, int], Box]] = [
+            # move up and left
+            lambda box, distance: Box(box.left - distance, box.upper - distance, box.right, box.lower),
+            # move up and right
+            lambda box, distance: Box(box.left, box.upper - distance, box.right + distance, box.lower),
+            # move down and right
+            lambda box, distance: Box(box.left, box.upper, box.right + distance, box.lower + distance),
+            # move down and left
+            lambda box, distance: Box(box.left - distance, box.upper, box.right, box.lower + distance)
+        ]
+
+        def gallop(grow: Callable[[int], Box], limit: int | None = None) -> Tuple[Box, Item] | None:
+            # the furthest grown reservation, up to limit, and its resized item, that fits
+            fits: Dict[int, Tuple[Box, Item]] = dict()
+
+            def fits_at(distance: int) -> bool:
+                grown_reservation = grow(distance)
+                if not(reservations_box.contains(grown_reservation)):
+                    return False
+                grown_item = expanded_item.resize_item(grown_reservation.remove_margin(margin).size)
+                if not(self._can_fit_on_reservation_map(
+                    add_margin_to_display_map(grown_item.display_map, margin),
+                    grown_reservation,
+                    reservation.reservation_no
+                )):
+                    return False
+                fits[distance] = (grown_reservation, grown_item)
+                return True
+
+            return fits.get(gallop_to_last_fit(fits_at, limit))
+
+        round_limit = 1
+        while True:
+            expansions = 0
+            if maximize_type == ResizeType.NO_RESIZE_TYPE:
+                for direction in Direction:
+                    if direction in deadends:
+                        continue
+                    fit = gallop(lambda distance: expanded_reservation.expand(distance, direction), round_limit)
+                    if fit is None:
+                        deadends.add(direction)
+                        continue
+                    expanded_reservation, expanded_item = fit
+                    expansions += 1
+            else:
+                for corner in corners:
+                    fit = gallop(lambda distance: corner(expanded_reservation, distance))
+                    if fit is None:
+                        continue
+                    expanded_reservation, expanded_item = fit
+                    expansions += 1
+                    break
+            if 0 == expansions:
+                break
+            round_limit *= 2
+
+        return Reservation(
+            reservation.name,
+            reservation.reservation_no,
+            expanded_reservation,
+            expanded_item
+        )
+
+    def to_maximize_rounds(self, reservations: List[Reservation]) -> List[List[int]]:
+        # Indexes of reservations, maximized in that order, grouped into rounds whose reservations can be maximized
+        # side by side. A reservation only grows within its reach, so those whose reaches overlap conflict; each goes
+        # in the round after the last of the earlier ones it conflicts with, keeping their order.
+        reaches = np.array([
+            (reach.left, reach.upper, reach.right, reach.lower)
+            for reach in [self._to_reach_box(reservation) for reservation in reservations]
+        ], dtype=np.int64).reshape(-1, 4)
+        conflicts = (
+            (reaches[:, np.newaxis, 0] < reaches[np.newaxis, :, 2]) & (reaches[np.newaxis, :, 0] < reaches[:, np.newaxis, 2])
+            & (reaches[:, np.newaxis, 1] < reaches[np.newaxis, :, 3]) & (reaches[np.newaxis, :, 1] < reaches[:, np.newaxis, 3])
+        )
+        result: List[List[int]] = list()
+        rounds = np.zeros(len(reservations), dtype=np.int64)
+        for index in range(len(reservations)):
+            earlier_conflicts = np.flatnonzero(conflicts[index, :index])
+            rounds[index] = 1 + rounds[earlier_conflicts].max() if 0 < len(earlier_conflicts) else 0
+            if len(result) <= rounds[index]:
+                result.append(list())
+            result[rounds[index]].append(index)
+        return result
+
+    def can_reserve_opening(self, reservation_no: int, opening: Box, party: Item, margin: int) -> bool:
+        # True when party fits at opening over all but reservation_no's own cells
+        return self._map_box.contains(opening) and self._can_fit_on_reservation_map(
+            add_margin_to_display_map(party.display_map, margin),
+            opening,
+            reservation_no
+        )
+
+    def _can_fit_on_reservation_map(self, item: DISPLAY_MAP_TYPE, target_item_box: Box, item_id: int | None = None) -> bool:
+        if self._tiled_reservation_map is not None:
+            return self._tiled_reservation_map.can_fit(item, target_item_box, item_id)
+        return can_fit_runs_on_target(item, self._reservation_map, self._occupancy_index, target_item_box, item_id)
+
+    def _to_reach_box(self, reservation: Reservation) -> Box:
+        # the reservation box grown in each direction, on its own, up to the first cell of another reservation.
+        # Growing keeps the reservation's rows and columns, so this holds every box it can grow to.
+        box = reservation.reservation_box
+        own_total = np.count_nonzero(
+            self._reservation_map[box.upper:box.lower, box.left:box.right] == reservation.reservation_no
+        )
+        others_total = self._occupied_total(box) - own_total
+
+        def reach(direction: Direction, limit: int) -> int:
+            return gallop_to_last_fit(
+                lambda distance: others_total == self._occupied_total(box.expand(distance, direction)) - own_total,
+                limit
+            )
+
+        return Box(
+            box.left - reach(Direction.LEFT, box.left),
+            box.upper - reach(Direction.UP, box.upper),
+            box.right + reach(Direction.RIGHT, self._map_box.right - box.right),
+            box.lower + reach(Direction.DOWN, self._map_box.lower - box.lower)
+        )
+
+    def _occupied_total(self, box: Box) -> int:
+        index = self._occupancy_index
+        return (
+            int(index[box.lower, box.right]) - int(index[box.upper, box.right])
+            - int(index[box.lower, box.left]) + int(index[box.upper, box.left])
+        )
+
+    def _concurrent_scan_executor(self) -> ThreadPoolExecutor:
+        # 1 pool per reservations, started on first use and shut down with them
+        if self._scan_executor is None:
+            self._scan_executor = ThreadPoolExecutor(
+                max_workers=self.num_threads,
+                initializer=Reservations._start_concurrent_scans,
+                initargs=(self._concurrent_scans, self._map_size, self._map_box, self._buffer_length)
+            )
+            weakref.finalize(self, self._scan_executor.shutdown, False)
+        return self._scan_executor
+
+    @staticmethod
+    def _start_concurrent_scans(concurrent_scans: threading.local, map_size: Size, map_box: Box, buffer_length: int) -> None:
+        # scans run side by side in the pool get their own buffer and 1 thread each, made once per worker,
+        # so that together they stay within num_threads. Nothing here refers back to the reservations,
+        # so the pool's threads do not keep them alive.
+        concurrent_scans.position_buffer = create_display_buffer(buffer_length)
+        concurrent_scans.native_reservations = native_create_reservations(
+            1,
+            map_size.to_native_size(),
+            map_box.to_native(),
+            buffer_length
+        )
+
+    def _scan_context(self) -> Tuple[dict, DISPLAY_BUFFER_TYPE]:
+        return (
+            getattr(self._concurrent_scans, 'native_reservations', self._native_reservations),
+            getattr(self._concurrent_scans, 'position_buffer', self._position_buffer)
+        )
+
+    def _find_unreserved_opening(
+            self,
+            item: DISPLAY_MAP_TYPE,
+            search_properties: SearchProperties
+    ) -> Box | None:
+        if not(self._has_free_cells_for(item)):
+            return None
+        occupied_box = find_occupied_box(item)
+        if self._no_fit_frontier.excludes(occupied_box.width, occupied_box.height):
+            return None
+        opening = self._search_unreserved_opening(item, search_properties)
+        if opening is None and occupied_box.area == item.size:
+            self._no_fit_frontier.add(occupied_box.width, occupied_box.height)
+        return opening
+
+    def _count_free_cells(self, first_row: int, last_row: int) -> None:
+        # brings the free counts of rows first_row up to last_row, and the total, back in line with the occupancy index
+        row_totals = self._occupancy_index[first_row:last_row + 1, -1].astype(np.int64)
+        self._free_row_counts[first_row:last_row] = self._map_size.width - np.diff(row_totals)
+        self._free_total = self._map_size.area - int(self._occupancy_index[-1, -1])
+
+    def _has_free_cells_for(self, item: DISPLAY_MAP_TYPE) -> bool:
+        # False when item holds more cells than are free, or no band of its rows has enough free cells in each row.
+        # Either way no scan can fit it.
+        item_row_counts = np.count_nonzero(item, axis=1)
+        if self._free_total < item_row_counts.sum():
+            return False
+        if len(self._free_row_counts) < len(item_row_counts):
+            return False
+        bands = np.lib.stride_tricks.sliding_window_view(self._free_row_counts, len(item_row_counts))
+        return bool((item_row_counts <= bands).all(axis=1).any())
+
+    def _search_unreserved_opening(
+            self,
+            item: DISPLAY_MAP_TYPE,
+            search_properties: SearchProperties
+    ) -> Box | None:
+        packed_item = to_packed_display_map(item)
+        if search_properties.is_spiral_walked:
+            native_opening = native_find_spiral_opening(
+                self._scan_context()[0],
+                self._occupancy_index,
+                self._packed_reservation_map,
+                item,
+                packed_item,
+                search_properties.to_native()
+            )
+            return Box.from_native(native_opening) if native_opening is not None else None
+        if search_properties.is_distance_ordered:
+            native_opening = native_find_searched_opening(
+                self._scan_context()[0],
+                self._occupancy_index,
+                self._packed_reservation_map,
+                item,
+                packed_item,
+                search_properties.to_native()
+            )
+            if native_opening is not None:
+                return Box.from_native(native_opening)
+        # no ordering, or nothing in the searched positions: search picks from all openings
+        openings = self._find_unreserved_openings(item, packed_item)
+        if 0 == len(openings):
+            return None
+        if search_properties.is_distance_ordered:
+            # the ordered search visited every opening in the searched positions, so search would find none of them
+            return search_properties.pick(openings)
+        return search_properties.search(openings)
 
     def _find_unreserved_openings(
             self,
-            item: DISPLAY_MAP_TYPE
-    ) -> List[Box]:
-        return from_native_box_array(
+            item: DISPLAY_MAP_TYPE,
+            packed_item: PACKED_DISPLAY_MAP_TYPE | None = None
+    ) -> BOX_ARRAY_TYPE:
+        opening_rows = self._map_size.height - item.shape[0] + 1
+        opening_cols = self._map_size.width - item.shape[1] + 1
+        if opening_rows <= 0 or opening_cols <= 0:
+            return to_box_array(np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), from_displaymap_size(item.shape))
+        cache_key = id(item)
+        with self._openings_lock:
+            cached_openings = self._openings_cache.get(cache_key)
+            if cached_openings is not None:
+                self._openings_cache.move_to_end(cache_key)
+                origins = cached_openings.origins
+                cached_total = cached_openings.reservation_total
+        # scans run outside the lock, so threads scanning other parties are not held up by them
+        reservation_total = len(self._reservations)
+        if cached_openings is None:
+            origins = np.zeros((opening_rows, opening_cols), dtype=bool)
+            origins[self._scan_unreserved_origins(item, packed_item)] = True
+        elif cached_total < reservation_total:
+            origins = self._refresh_origins(origins, self._reservations[cached_total:reservation_total], item, packed_item)
+        with self._openings_lock:
+            cached_openings = self._openings_cache.get(cache_key)
+            if cached_openings is None:
+                finalizer = weakref.finalize(item, self._openings_cache.pop, cache_key, None)
+                self._openings_cache[cache_key] = CachedOpenings(origins, reservation_total, finalizer)
+                if OPENINGS_CACHE_CAPACITY < len(self._openings_cache):
+                    _, evicted_openings = self._openings_cache.popitem(last=False)
+                    evicted_openings.finalizer.detach()
+            elif cached_openings.reservation_total < reservation_total:
+                # unless another thread already published origins at least as recent
+                cached_openings.origins = origins
+                cached_openings.reservation_total = reservation_total
+        rows, cols = np.nonzero(origins)
+        return to_box_array(cols, rows, from_displaymap_size(item.shape))
+
+    def _refresh_origins(
+            self,
+            origins: np.ndarray,
+            later_reservations: List[Reservation],
+            item: DISPLAY_MAP_TYPE,
+            packed_item: PACKED_DISPLAY_MAP_TYPE | None = None
+    ) -> np.ndarray:
+        # only origins whose party window overlaps a later reservation can have changed.
+        # published origins are shared between threads, so a copy is refreshed
+        packed_item = packed_item if packed_item is not None else to_packed_display_map(item)
+        origins = origins.copy()
+        for reservation in later_reservations:
+            reserved_box = reservation.reservation_box
+            dirty_origins = Box(
+                max(reserved_box.left - item.shape[1] + 1, 0),
+                max(reserved_box.upper - item.shape[0] + 1, 0),
+                min(reserved_box.right, origins.shape[1]),
+                min(reserved_box.lower, origins.shape[0])
+            )
+            if dirty_origins.right <= dirty_origins.left or dirty_origins.lower <= dirty_origins.upper:
+                continue
+            origins[dirty_origins.upper:dirty_origins.lower, dirty_origins.left:dirty_origins.right] = False
+            native_reservations, position_buffer = self._scan_context()
+            origins[to_native_openings_origins(native_find_openings_in_area(
+                native_reservations,
+                position_buffer,
+                self._reservation_map,
+                self._occupancy_index,
+                self._packed_reservation_map,
+                item,
+                packed_item,
+                dirty_origins.to_native()
+            ))] = True
+        return origins
+
+    def _scan_unreserved_origins(
+            self,
+            item: DISPLAY_MAP_TYPE,
+            packed_item: PACKED_DISPLAY_MAP_TYPE | None = None
+    ) -> OPENING_ORIGINS_TYPE:
+        occupied_rows = np.flatnonzero(item.any(axis=1))
+        occupied_cols = np.flatnonzero(item.any(axis=0))
+        if 0 < len(occupied_rows) and self._free_rectangles.is_enabled:
+            occupied_box = Box(int(occupied_cols[0]), int(occupied_rows[0]), int(occupied_cols[-1]) + 1, int(occupied_rows[-1]) + 1)
+            if occupied_box.area == np.count_nonzero(item):
+                # rectangular party: its openings come straight from the free rectangles
+                return self._free_rectangles.find_origins(from_displaymap_size(item.shape), occupied_box)
+        if CORRELATION_MIN_PARTY_AREA <= item.size and not(item.all()):
+            return self._find_correlated_origins(item)
+        native_reservations, position_buffer = self._scan_context()
+        return to_native_openings_origins(
             native_find_openings(
-                self._native_reservations,
-                self._position_buffer,
+                native_reservations,
+                position_buffer,
                 self._reservation_map,
-                item
+                self._occupancy_index,
+                self._packed_reservation_map,
+                item,
+                packed_item if packed_item is not None else to_packed_display_map(item)
             )
         )
 
+    def _find_correlated_origins(
+            self,
+            item: DISPLAY_MAP_TYPE
+    ) -> OPENING_ORIGINS_TYPE:
+        fft_shape = to_fft_shape(item.shape, self._reservation_map.shape)
+        reservation_spectrum = self._reservation_spectrums.get(fft_shape)
+        if reservation_spectrum is None:
+            reservation_spectrum = to_display_map_spectrum(self._reservation_map, fft_shape)
+            self._reservation_spectrums[fft_shape] = reservation_spectrum
+        overlaps = correlate_display_map(item, self._reservation_map.shape, reservation_spectrum, fft_shape)
+        # overlap counts are whole numbers, less fft rounding error
+        return np.nonzero(overlaps < 0.5)
+
     @staticmethod
-    def create_reservations(reservation_map: DISPLAY_MAP_TYPE, logger: BaseLogger):
+    def create_reservations(reservation_map: DISPLAY_MAP_TYPE, logger: BaseLogger, tiled_reservation_map: bool = False):
         result = Reservations(logger)
         result._map_size = Size(reservation_map.shape[1], reservation_map.shape[0])
         result._map_box = Box(0, 0, result._map_size.width, result._map_size.height)
         result._buffer_length = result._map_size.area
         result._reservation_map = reservation_map
+        result._occupancy_index = create_occupancy_index(result._map_size)
+        write_occupancy_index(result._reservation_map, result._occupancy_index, result._map_box)
+        result._free_row_counts = np.zeros(result._map_size.height, dtype=np.int64)
+        result._count_free_cells(0, result._map_size.height)
+        result._packed_reservation_map = to_packed_display_map(result._reservation_map)
+        result._tiled_reservation_map = TiledDisplayMap.from_display_map(result._reservation_map) if tiled_reservation_map else None
+        result._reservation_spectrums = dict()
+        result._free_rectangles = FreeRectangles(result._map_box)
+        result._free_rectangles.reserve(result._reservation_map, result._map_box)
+        result._openings_cache = OrderedDict()
         result._position_buffer = create_display_buffer(result._buffer_length)
         result._native_reservations = native_create_reservations(
             result.num_threads,
@@ -19,6 +19,18 @@ def parse_to_resize_type(s: str) -> ResizeType:
             return member
     raise ValueError('{0} unsupported. Must be one of [{1}]'.format(s, '{0}'.format('|'.join(RESIZE_TYPES))))
 
+class SizingType(Enum):
+    LINEAR = 1
+    GALLOPING = 2
+
+SIZING_TYPES = [member.name for member in SizingType]
+
+def parse_to_sizing_type(s: str) -> SizingType:
+    for member in SizingType:
+        if s.upper() == member.name:
+            return member
+    raise ValueError('{0} unsupported. Must be one of [{1}]'.format(s, '{0}'.format('|'.join(SIZING_TYPES))))
+
 class Size:
 
     def __init__(self, width: int, height: int) -> None:
@@ -1,18 +1,30 @@
 from PIL import Image
 import numpy as np
+import weakref
 from enum import Enum
-from typing import Callable, Tuple
+from typing import Callable, Dict, Tuple
 from itemcloud.box import Box
 from itemcloud.size import Size
 from itemcloud.native.display_map import (
-    native_write_to_margined_item,
-    native_can_fit_on_target
+    native_write_to_target,
+    native_can_fit_on_target,
+    native_can_fit_runs_on_target,
+    native_write_display_map_runs,
+    native_write_occupancy_index,
+    native_write_packed_display_map,
+    native_find_occupied_box
 )
 IS_TRANSPARENT_PIXEL_FUNCTION_TYPE = Callable[[tuple], bool]
 DISPLAY_MAP_SIZE_TYPE = tuple[int, int]
 DISPLAY_NP_DATA_TYPE = np.uint32
 DISPLAY_MAP_TYPE = np.ndarray[DISPLAY_NP_DATA_TYPE, DISPLAY_NP_DATA_TYPE]
 DISPLAY_BUFFER_TYPE = np.ndarray[DISPLAY_NP_DATA_TYPE]
+PACKED_DISPLAY_NP_DATA_TYPE = np.uint64
+PACKED_DISPLAY_MAP_TYPE = np.ndarray[PACKED_DISPLAY_NP_DATA_TYPE, PACKED_DISPLAY_NP_DATA_TYPE]
+PACKED_WORD_BITS = 64
+# occupied runs of a display map, a (row, col, length) row per run in row-major order
+DISPLAY_MAP_RUNS_NP_DATA_TYPE = np.int32
+DISPLAY_MAP_RUNS_TYPE = np.ndarray[DISPLAY_MAP_RUNS_NP_DATA_TYPE, DISPLAY_MAP_RUNS_NP_DATA_TYPE]
 def from_displaymap_size(display_map_shape: DISPLAY_MAP_SIZE_TYPE) -> Size:
     return Size(display_map_shape[1], display_map_shape[0]) # columns == width, rows == height
 
@@ -42,6 +54,55 @@ def create_display_buffer(length: int, initial_value: int = 0) -> DISPLAY_BUFFER
     return np.full((length), dtype=DISPLAY_NP_DATA_TYPE, fill_value=initial_value)
 
 
+def create_occupancy_index(size: Size) -> DISPLAY_MAP_TYPE:
+    # summed-area table of occupied cells, 1 larger than the display map in each dimension
+    return create_display_map(Size(size.width + 1, size.height + 1))
+
+def write_occupancy_index(target: DISPLAY_MAP_TYPE, occupancy_index: DISPLAY_MAP_TYPE, written_box: Box) -> None:
+    native_write_occupancy_index(target, occupancy_index, written_box.to_native())
+
+def create_packed_display_map(size: Size) -> PACKED_DISPLAY_MAP_TYPE:
+    # 1 bit per cell, each row padded out to whole 64 bit words
+    return np.zeros((size.height, (size.width + PACKED_WORD_BITS - 1) // PACKED_WORD_BITS), dtype=PACKED_DISPLAY_NP_DATA_TYPE)
+
+def write_packed_display_map(display_map: DISPLAY_MAP_TYPE, packed_map: PACKED_DISPLAY_MAP_TYPE, written_box: Box) -> None:
+    native_write_packed_display_map(display_map, packed_map, written_box.to_native())
+
+def to_packed_display_map(display_map: DISPLAY_MAP_TYPE) -> PACKED_DISPLAY_MAP_TYPE:
+    map_size = from_displaymap_size(display_map.shape)
+    result = create_packed_display_map(map_size)
+    write_packed_display_map(display_map, result, from_displaymap_box(display_map.shape))
+    return result
+
+def to_fft_length(length: int) -> int:
+    # smallest 2^i * 3^j * 5^k >= length, the lengths numpy's fft handles fastest
+    result = length
+    while True:
+        remainder = result
+        for factor in (2, 3, 5):
+            while 0 == (remainder % factor):
+                remainder //= factor
+        if 1 == remainder:
+            return result
+        result += 1
+
+def to_fft_shape(item_shape: DISPLAY_MAP_SIZE_TYPE, target_shape: DISPLAY_MAP_SIZE_TYPE) -> DISPLAY_MAP_SIZE_TYPE:
+    # large enough that correlating item over target does not wrap around
+    return (
+        to_fft_length(target_shape[0] + item_shape[0] - 1),
+        to_fft_length(target_shape[1] + item_shape[1] - 1)
+    )
+
+def to_display_map_spectrum(display_map: DISPLAY_MAP_TYPE, fft_shape: DISPLAY_MAP_SIZE_TYPE) -> np.ndarray:
+    return np.fft.rfft2(display_map != 0, s=fft_shape)
+
+def correlate_display_map(item: DISPLAY_MAP_TYPE, target_shape: DISPLAY_MAP_SIZE_TYPE, target_spectrum: np.ndarray, fft_shape: DISPLAY_MAP_SIZE_TYPE) -> np.ndarray:
+    # result[row, col] is the number of occupied item cells landing on occupied target cells
+    # when the item is placed at (row, col), for every placement inside the target
+    item_spectrum = to_display_map_spectrum(item[::-1, ::-1], fft_shape)
+    overlaps = np.fft.irfft2(target_spectrum * item_spectrum, s=fft_shape)
+    return overlaps[item.shape[0] - 1:target_shape[0], item.shape[1] - 1:target_shape[1]]
+
 def pixel_sum(img_pixel) -> int:
     total = 0
     for i in range(len(img_pixel)):
@@ -60,16 +121,18 @@ def is_transparent(img_pixel) -> bool:
     global g_max_alpha_value_for_transparency
     return len(img_pixel) == 4 and img_pixel[3] <= g_max_alpha_value_for_transparency
 
+def get_max_alpha_value_for_transparency() -> int:
+    global g_max_alpha_value_for_transparency
+    return g_max_alpha_value_for_transparency
+
 def img_to_display_map(img: Image.Image, map_fill_type: MapFillType = MapFillType.TRANSPARENT) -> DISPLAY_MAP_TYPE:
+    global g_max_alpha_value_for_transparency
     result = create_display_map(Size(img.width, img.height), 1)
     if map_fill_type == MapFillType.TRANSPARENT:
-        if img.has_transparency_data:
-            pixels = img.load()
-            for x in range(img.width):
-                for y in range(img.height):
-                    pixel = pixels[x,y]
-                    if is_transparent(pixel):
-                        result[y,x] = 0 # y == rows, x == cols
+        # only 4 band pixels carry an alpha is_transparent reads, compared here a whole band at a time
+        if img.has_transparency_data and 4 == len(img.getbands()):
+            alpha = np.asarray(img.getchannel(3))
+            result[alpha <= g_max_alpha_value_for_transparency] = 0 # y == rows, x == cols
     if not(1 in result):
         raise ValueError('Empty Image')
     return result
@@ -77,27 +140,115 @@ def img_to_display_map(img: Image.Image, map_fill_type: MapFillType = MapFillTyp
 def size_to_display_map(size: Size) -> DISPLAY_MAP_TYPE:
     return create_display_map(size, 1)
 
+def resize_display_map(display_map: DISPLAY_MAP_TYPE, size: Size) -> DISPLAY_MAP_TYPE:
+    # nearest neighbour resample, each new cell taking the cell under its center
+    rows, cols = display_map.shape
+    new_rows, new_cols = to_displaymap_size(size)
+    row_indexes = np.minimum(((np.arange(new_rows) + 0.5) * rows / new_rows).astype(np.intp), rows - 1)
+    col_indexes = np.minimum(((np.arange(new_cols) + 0.5) * cols / new_cols).astype(np.intp), cols - 1)
+    return np.ascontiguousarray(display_map[row_indexes[:, np.newaxis], col_indexes[np.newaxis, :]])
+
+def rotate_display_map(display_map: DISPLAY_MAP_TYPE, degrees: float) -> DISPLAY_MAP_TYPE:
+    # rotated as Image.rotate(degrees, expand=True) rotates an image, so it keeps the rotated image's size.
+    # Right angles are exact, others a nearest neighbour affine resample.
+    if 0 == (degrees % 90):
+        return np.ascontiguousarray(np.rot90(display_map, int(degrees // 90) % 4))
+    cells = Image.fromarray(np.where(display_map != 0, 255, 0).astype(np.uint8), 'L')
+    rotated = np.asarray(cells.rotate(degrees, Image.Resampling.NEAREST, expand=True))
+    return (rotated != 0).astype(DISPLAY_NP_DATA_TYPE)
+
+# margined maps of each display map, by margin. Keyed on the display map's id and dropped
+# with it, so a resized or rotated item (a new display map) never finds a stale entry.
+g_margined_display_maps: Dict[int, Dict[int, DISPLAY_MAP_TYPE]] = dict()
+
+def _max_filter_rows(occupied: np.ndarray, width: int) -> np.ndarray:
+    # result[row] = any of occupied[row:row + width], so width - 1 rows shorter.
+    # Windows double each pass, taking log(width) passes.
+    result = occupied
+    covered = 1
+    while covered < width:
+        step = min(covered, width - covered)
+        result = result[:-step] | result[step:]
+        covered += step
+    return result
+
+def dilate_display_map(item: DISPLAY_MAP_TYPE, margin: int) -> DISPLAY_MAP_TYPE:
+    # item, margin cells bigger on every side, with every cell within margin cells (rows and cols) of an occupied one occupied.
+    # A square max filter, applied as one over rows then one over cols.
+    rows, cols = item.shape
+    padded = np.zeros((rows + (margin * 4), cols + (margin * 4)), dtype=bool)
+    padded[margin * 2:(margin * 2) + rows, margin * 2:(margin * 2) + cols] = item != 0
+    width = (margin * 2) + 1
+    dilated = _max_filter_rows(_max_filter_rows(padded, width).T, width).T
+    return np.ascontiguousarray(dilated, dtype=DISPLAY_NP_DATA_TYPE)
+
 def add_margin_to_display_map(item: DISPLAY_MAP_TYPE, margin: int, map_fill_type: MapFillType = MapFillType.TRANSPARENT) -> DISPLAY_MAP_TYPE:
-    result = create_display_map(from_displaymap_size((item.shape[0] + (margin * 2), item.shape[1] + (margin * 2))), map_fill_type.value)
-    if map_fill_type == MapFillType.TRANSPARENT:
-        native_write_to_margined_item(item, result)
+    # the returned map is shared by every caller margining the same item, it must not be written to
+    if map_fill_type != MapFillType.TRANSPARENT:
+        return create_display_map(from_displaymap_size((item.shape[0] + (margin * 2), item.shape[1] + (margin * 2))), map_fill_type.value)
+    item_key = id(item)
+    margined_maps = g_margined_display_maps.get(item_key)
+    if margined_maps is None:
+        margined_maps = g_margined_display_maps.setdefault(item_key, dict())
+        weakref.finalize(item, g_margined_display_maps.pop, item_key, None)
+    result = margined_maps.get(margin)
+    if result is None:
+        result = dilate_display_map(item, margin)
+        margined_maps[margin] = result
+    return result
+
+# occupied runs of each display map, keyed and dropped as g_margined_display_maps is
+g_display_map_runs: Dict[int, DISPLAY_MAP_RUNS_TYPE] = dict()
+
+def to_display_map_runs(item: DISPLAY_MAP_TYPE) -> DISPLAY_MAP_RUNS_TYPE:
+    # the returned runs are shared by every caller for the same item, they must not be written to
+    item_key = id(item)
+    result = g_display_map_runs.get(item_key)
+    if result is None:
+        # most masks take a few runs a row, and a second pass gets the rest of those that take more
+        result = np.empty((item.shape[0] * 4, 3), dtype=DISPLAY_MAP_RUNS_NP_DATA_TYPE)
+        total_runs = native_write_display_map_runs(item, result)
+        if len(result) < total_runs:
+            result = np.empty((total_runs, 3), dtype=DISPLAY_MAP_RUNS_NP_DATA_TYPE)
+            native_write_display_map_runs(item, result)
+        result = result[:total_runs]
+        g_display_map_runs[item_key] = result
+        weakref.finalize(item, g_display_map_runs.pop, item_key, None)
     return result
 
 def write_display_map(item: DISPLAY_MAP_TYPE, target: DISPLAY_MAP_TYPE, target_location: Box, item_value: int):
-    plots = _write_to_target(item, target, target_location, item_value)
+    item_box = Box(
+        target_location.left,
+        target_location.upper,
+        target_location.left + item.shape[1],
+        target_location.upper + item.shape[0]
+    )
+    if not(from_displaymap_box(target.shape).contains(item_box)):
+        raise ValueError(f'{item_box.box_to_string()} is outside {from_displaymap_box(target.shape).box_to_string()}')
+    plots = native_write_to_target(item, target, target_location.to_native(), item_value)
     if plots == 0:
         raise ValueError('Nothin')
 
+def find_occupied_box(item: DISPLAY_MAP_TYPE) -> Box:
+    # largest fully occupied box in item, empty when nothing is occupied
+    return Box.from_native(native_find_occupied_box(item))
+
 def can_fit_on_target(item: DISPLAY_MAP_TYPE, target: DISPLAY_MAP_TYPE, target_item_box: Box, item_id: int | None = None, ) -> bool:
     return 0 != native_can_fit_on_target(item, target, target_item_box.to_native(), item_id if item_id is not None else 0)
 
-def _write_to_target(item: DISPLAY_MAP_TYPE, target: DISPLAY_MAP_TYPE, target_location: Box, item_id: int) -> int:
-    target_row = target_location.upper
-    target_col = target_location.left
-    result = 0
-    for item_row in range(item.shape[0]):
-        for item_col in range(item.shape[1]):
-            if item[item_row, item_col] != 0:
-                result += 1
-                target[target_row + item_row, target_col + item_col] = item_id
-    return result
+def can_fit_runs_on_target(
+    item: DISPLAY_MAP_TYPE,
+    target: DISPLAY_MAP_TYPE,
+    occupancy_index: DISPLAY_MAP_TYPE,
+    target_item_box: Box,
+    item_id: int | None = None
+) -> bool:
+    # as can_fit_on_target, comparing only item's occupied runs, each against the occupancy index of target first
+    return 0 != native_can_fit_runs_on_target(
+        to_display_map_runs(item),
+        from_displaymap_size(item.shape).to_native_size(),
+        target,
+        occupancy_index,
+        target_item_box.to_native(),
+        item_id if item_id is not None else 0
+    )
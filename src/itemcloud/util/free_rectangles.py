@@ -0,0 +1,131 @@
+import numpy as np
+from typing import Dict, List, Tuple
+from itemcloud.box import Box
+from itemcloud.size import Size
+from itemcloud.util.display_map import DISPLAY_MAP_TYPE
+
+# past these counts the index costs more to keep than the pixel scan it replaces
+MAX_FREE_RECTANGLES = 2048
+MAX_RESERVED_RECTANGLES = 256
+
+# free rectangles are rows of (left, upper, right, lower)
+FREE_RECTANGLES_NP_DATA_TYPE = np.int32
+FREE_RECTANGLES_TYPE = np.ndarray[FREE_RECTANGLES_NP_DATA_TYPE, FREE_RECTANGLES_NP_DATA_TYPE]
+LEFT, UPPER, RIGHT, LOWER = 0, 1, 2, 3
+
+def to_occupied_boxes(display_map: DISPLAY_MAP_TYPE, location: Box, max_boxes: int) -> List[Box] | None:
+    # occupied cells of display_map, placed at location, as boxes of identical row runs stacked vertically
+    # None when it takes more than max_boxes boxes
+    rows, cols = display_map.shape
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = display_map != 0
+    edges = np.diff(padded, axis=1)
+    result: List[Box] = list()
+    open_runs: Dict[Tuple[int, int], int] = dict()
+    for row in range(rows + 1):
+        runs = set() if row == rows else set(zip(
+            np.flatnonzero(edges[row] == 1).tolist(),
+            np.flatnonzero(edges[row] == -1).tolist()
+        ))
+        for run in [run for run in open_runs if run not in runs]:
+            result.append(Box(
+                location.left + run[0],
+                location.upper + open_runs.pop(run),
+                location.left + run[1],
+                location.upper + row
+            ))
+        for run in runs:
+            if run not in open_runs:
+                open_runs[run] = row
+        if max_boxes < (len(result) + len(open_runs)):
+            return None
+    return result
+
+class FreeRectangles(object):
+    # MaxRects index: every maximal rectangle of unoccupied cells in an area.
+    # Any unoccupied box lies inside at least one of them.
+    def __init__(self, area: Box):
+        self._area = area
+        self._rectangles: FREE_RECTANGLES_TYPE | None = np.array(
+            [[area.left, area.upper, area.right, area.lower]],
+            dtype=FREE_RECTANGLES_NP_DATA_TYPE
+        )
+
+    @property
+    def is_enabled(self) -> bool:
+        return self._rectangles is not None
+
+    @property
+    def rectangles(self) -> FREE_RECTANGLES_TYPE | None:
+        return self._rectangles
+
+    def disable(self) -> None:
+        self._rectangles = None
+
+    def reserve(self, party: DISPLAY_MAP_TYPE, opening: Box) -> None:
+        if not(self.is_enabled):
+            return
+        occupied_boxes = to_occupied_boxes(party, opening, MAX_RESERVED_RECTANGLES)
+        if occupied_boxes is None:
+            self.disable()
+            return
+        for occupied_box in occupied_boxes:
+            self._subtract(occupied_box)
+            if MAX_FREE_RECTANGLES < len(self._rectangles):
+                self.disable()
+                return
+
+    def find_origins(self, party_size: Size, occupied_box: Box) -> Tuple[np.ndarray, np.ndarray] | None:
+        # (rows, cols), in row-major order, of every origin where party_size placed there keeps its
+        # occupied_box (relative to the party) inside a free rectangle. None when disabled.
+        if not(self.is_enabled):
+            return None
+        opening_rows = self._area.height - party_size.height + 1
+        opening_cols = self._area.width - party_size.width + 1
+        if opening_rows <= 0 or opening_cols <= 0:
+            return (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp))
+        origins = np.zeros((opening_rows, opening_cols), dtype=bool)
+        for left, upper, right, lower in self._rectangles.tolist():
+            first_row = max(upper - self._area.upper - occupied_box.upper, 0)
+            last_row = min(lower - self._area.upper - occupied_box.lower, opening_rows - 1)
+            first_col = max(left - self._area.left - occupied_box.left, 0)
+            last_col = min(right - self._area.left - occupied_box.right, opening_cols - 1)
+            if first_row <= last_row and first_col <= last_col:
+                origins[first_row:last_row + 1, first_col:last_col + 1] = True
+        return np.nonzero(origins)
+
+    def _subtract(self, box: Box) -> None:
+        rectangles = self._rectangles
+        hit = (
+            (rectangles[:, LEFT] < box.right) & (box.left < rectangles[:, RIGHT])
+            & (rectangles[:, UPPER] < box.lower) & (box.upper < rectangles[:, LOWER])
+        )
+        if not(hit.any()):
+            return
+        kept = rectangles[~hit]
+        cut = rectangles[hit]
+        pieces = list()
+        for side, is_outside, edge, edge_value in (
+            (LEFT, cut[:, LEFT] < box.left, RIGHT, box.left),
+            (RIGHT, box.right < cut[:, RIGHT], LEFT, box.right),
+            (UPPER, cut[:, UPPER] < box.upper, LOWER, box.upper),
+            (LOWER, box.lower < cut[:, LOWER], UPPER, box.lower)
+        ):
+            piece = cut[is_outside].copy()
+            piece[:, edge] = edge_value
+            pieces.append(piece)
+        pieces = np.concatenate(pieces)
+        # a piece is dropped when another rectangle contains it; of equal pieces only the first is kept
+        candidates = np.concatenate((kept, pieces))
+        contains = (
+            (candidates[np.newaxis, :, LEFT] <= pieces[:, np.newaxis, LEFT])
+            & (candidates[np.newaxis, :, UPPER] <= pieces[:, np.newaxis, UPPER])
+            & (pieces[:, np.newaxis, RIGHT] <= candidates[np.newaxis, :, RIGHT])
+            & (pieces[:, np.newaxis, LOWER] <= candidates[np.newaxis, :, LOWER])
+        )
+        piece_indexes = np.arange(len(pieces))
+        contains[piece_indexes, len(kept) + piece_indexes] = False
+        equals = (candidates[np.newaxis, :, :] == pieces[:, np.newaxis, :]).all(axis=2)
+        later_equal = equals & (np.arange(len(candidates))[np.newaxis, :] > (len(kept) + piece_indexes)[:, np.newaxis])
+        contains &= ~later_equal
+        self._rectangles = np.concatenate((kept, pieces[~contains.any(axis=1)]))
@@ -1,15 +1,45 @@
+import random
 import secrets
 from typing import Callable, List
+from itemcloud.native.math import native_seed_random
 
 RandomInRangeFunction = Callable[[int], int]
 RandomShuffleFunction = Callable[[List, int | None], None]
 
+# None until seed_random is called with a seed, picks then come from secrets
+_seeded_random: random.Random | None = None
+
+def seed_random(seed: int | None) -> None:
+    # seeds the python picks here and the native generator used by the search, so a run can be replayed.
+    # None goes back to unseeded picks.
+    global _seeded_random
+    if seed is None:
+        _seeded_random = None
+        native_seed_random(secrets.randbits(64))
+        return
+    _seeded_random = random.Random(seed)
+    native_seed_random(seed & 0xFFFFFFFFFFFFFFFF)
+
+def is_random_seeded() -> bool:
+    return _seeded_random is not None
+
+def next_random_seed() -> int:
+    # 63 bit seed (room to offset it) for deriving further generators, following the seeded picks when seeded
+    if _seeded_random is None:
+        return secrets.randbits(63)
+    return _seeded_random.getrandbits(63)
+
+def _random_below(upper: int) -> int:
+    if _seeded_random is None:
+        return secrets.randbelow(upper)
+    return _seeded_random.randrange(upper)
+
 def random_in_range(range_size: int) -> int:
-    return secrets.randbelow(range_size - 1)
+    return _random_below(range_size - 1)
 
 
 def random_shuffle(data: list, length: int | None = None) -> None:
-    shuffle_len: int = length if length is not None else len(data) 
+    shuffle_len: int = length if length is not None else len(data)
     for i in range(shuffle_len - 1, 0, -1):
-        j = secrets.randbelow(i - 1)
+        j = _random_below(i - 1)
         data[j], data[i] = data[i], data[j]
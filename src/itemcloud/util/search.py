@@ -1,7 +1,7 @@
 from typing import List
 from itemcloud.box import (
     Box,
-    to_native_box_array
+    BOX_ARRAY_TYPE
 )
 from itemcloud.util.search_types import (
     RelativeDistance,
@@ -11,6 +11,7 @@ from itemcloud.util.search_types import (
 from itemcloud.native.search import (
     native_start_search,
     native_search,
+    native_pick,
     native_next_search
 )
 
@@ -37,13 +38,28 @@ class SearchProperties:
 
     def to_native(self):
         return self.native
+
+    @property
+    def is_spiral_walked(self) -> bool:
+        # the first opening along a spiral out from the origin is taken, without finding any others
+        return self.pattern == SearchPattern.ARCHIMEDEAN
+
+    @property
+    def is_distance_ordered(self) -> bool:
+        # openings can be visited nearest (or farthest) first, instead of picking from all openings
+        return self.pattern != SearchPattern.NONE and self.distance != RelativeDistance.RANDOM
     
-    def search(self, boxes: List[Box]) -> Box:
+    def search(self, boxes: BOX_ARRAY_TYPE) -> Box:
+        # boxes are read in place, see to_box_array
         return Box.from_native(native_search(
-            to_native_box_array(boxes),
+            boxes,
             self.to_native()
         ))
 
+    def pick(self, boxes: BOX_ARRAY_TYPE) -> Box:
+        # any of boxes, as search picks when none lies in the searched positions
+        return Box.from_native(native_pick(boxes))
+
     def next(self, last_found: Box) -> 'SearchProperties':
         return SearchProperties.from_native(native_next_search(
             last_found.to_native(),
@@ -23,6 +23,7 @@ class SearchPattern(Enum):
     LINEAR = 2
     RAY = 3
     SPIRAL = 4
+    ARCHIMEDEAN = 5
 
 
 SEARCH_PATTERNS = [p.name for p in SearchPattern]
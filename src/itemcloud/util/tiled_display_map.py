@@ -0,0 +1,107 @@
+import numpy as np
+from itemcloud.box import Box
+from itemcloud.size import Size
+from itemcloud.util.display_map import (
+    DISPLAY_MAP_TYPE,
+    DISPLAY_NP_DATA_TYPE,
+    from_displaymap_box,
+    from_displaymap_size
+)
+from itemcloud.native.display_map import (
+    native_can_fit_on_tiled_target,
+    native_write_to_tiled_target
+)
+
+DISPLAY_MAP_TILE_SIZE = 64
+# tiled maps are of shape (tiles, DISPLAY_MAP_TILE_SIZE, DISPLAY_MAP_TILE_SIZE)
+TILED_DISPLAY_MAP_TYPE = np.ndarray[DISPLAY_NP_DATA_TYPE, DISPLAY_NP_DATA_TYPE]
+TILE_ORDER_NP_DATA_TYPE = np.int32
+TILE_ORDER_TYPE = np.ndarray[TILE_ORDER_NP_DATA_TYPE, TILE_ORDER_NP_DATA_TYPE]
+
+def _interleave_bits(values: np.ndarray) -> np.ndarray:
+    # spreads the bits of each value out to every other bit
+    result = np.zeros(values.shape, dtype=np.int64)
+    for bit in range(int(values.max()).bit_length() if 0 < values.size else 0):
+        result |= ((values >> bit) & 1) << (bit * 2)
+    return result
+
+def to_tile_order(tile_rows: int, tile_cols: int) -> TILE_ORDER_TYPE:
+    # result[tile_row, tile_col] is the tile's place in Morton (z) order, so tiles near each other on the map
+    # are mostly near each other in memory
+    rows, cols = np.indices((tile_rows, tile_cols), dtype=np.int64)
+    morton_codes = (_interleave_bits(rows) << 1) | _interleave_bits(cols)
+    result = np.empty(tile_rows * tile_cols, dtype=TILE_ORDER_NP_DATA_TYPE)
+    result[np.argsort(morton_codes, axis=None, kind='stable')] = np.arange(tile_rows * tile_cols, dtype=TILE_ORDER_NP_DATA_TYPE)
+    return result.reshape((tile_rows, tile_cols))
+
+class TiledDisplayMap(object):
+    # A display map stored as DISPLAY_MAP_TILE_SIZE square tiles, row-major within a tile and tiles in Morton order.
+    # A window of the map reads a few whole tiles instead of 1 stretch of memory per row.
+    def __init__(self, size: Size):
+        self._size = size
+        tile_rows = (size.height + DISPLAY_MAP_TILE_SIZE - 1) // DISPLAY_MAP_TILE_SIZE
+        tile_cols = (size.width + DISPLAY_MAP_TILE_SIZE - 1) // DISPLAY_MAP_TILE_SIZE
+        self._tile_order = to_tile_order(tile_rows, tile_cols)
+        self._tiles: TILED_DISPLAY_MAP_TYPE = np.zeros(
+            (tile_rows * tile_cols, DISPLAY_MAP_TILE_SIZE, DISPLAY_MAP_TILE_SIZE),
+            dtype=DISPLAY_NP_DATA_TYPE
+        )
+
+    @property
+    def size(self) -> Size:
+        return self._size
+
+    @property
+    def tiles(self) -> TILED_DISPLAY_MAP_TYPE:
+        return self._tiles
+
+    @property
+    def tile_order(self) -> TILE_ORDER_TYPE:
+        return self._tile_order
+
+    def _to_grid(self) -> np.ndarray:
+        # tiles as (tile_rows, tile_cols, DISPLAY_MAP_TILE_SIZE, DISPLAY_MAP_TILE_SIZE)
+        return self._tiles[self._tile_order]
+
+    def to_display_map(self) -> DISPLAY_MAP_TYPE:
+        tile_rows, tile_cols = self._tile_order.shape
+        padded = self._to_grid().transpose(0, 2, 1, 3).reshape(
+            (tile_rows * DISPLAY_MAP_TILE_SIZE, tile_cols * DISPLAY_MAP_TILE_SIZE)
+        )
+        return np.ascontiguousarray(padded[:self._size.height, :self._size.width])
+
+    @staticmethod
+    def from_display_map(display_map: DISPLAY_MAP_TYPE) -> "TiledDisplayMap":
+        result = TiledDisplayMap(from_displaymap_size(display_map.shape))
+        tile_rows, tile_cols = result._tile_order.shape
+        padded = np.zeros((tile_rows * DISPLAY_MAP_TILE_SIZE, tile_cols * DISPLAY_MAP_TILE_SIZE), dtype=DISPLAY_NP_DATA_TYPE)
+        padded[:display_map.shape[0], :display_map.shape[1]] = display_map
+        grid = padded.reshape((tile_rows, DISPLAY_MAP_TILE_SIZE, tile_cols, DISPLAY_MAP_TILE_SIZE)).transpose(0, 2, 1, 3)
+        result._tiles[result._tile_order] = grid
+        return result
+
+    def write(self, item: DISPLAY_MAP_TYPE, target_location: Box, item_value: int) -> None:
+        # as write_display_map
+        item_box = Box(
+            target_location.left,
+            target_location.upper,
+            target_location.left + item.shape[1],
+            target_location.upper + item.shape[0]
+        )
+        map_box = from_displaymap_box((self._size.height, self._size.width))
+        if not(map_box.contains(item_box)):
+            raise ValueError(f'{item_box.box_to_string()} is outside {map_box.box_to_string()}')
+        plots = native_write_to_tiled_target(item, self._tiles, self._tile_order, target_location.to_native(), item_value)
+        if plots == 0:
+            raise ValueError('Nothin')
+
+    def can_fit(self, item: DISPLAY_MAP_TYPE, target_item_box: Box, item_id: int | None = None) -> bool:
+        # as can_fit_on_target
+        return 0 != native_can_fit_on_tiled_target(
+            item,
+            self._tiles,
+            self._tile_order,
+            self._size.to_native_size(),
+            target_item_box.to_native(),
+            item_id if item_id is not None else 0
+        )
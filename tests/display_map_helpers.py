@@ -0,0 +1,30 @@
+import numpy as np
+from itemcloud.util.display_map import DISPLAY_NP_DATA_TYPE
+
+def overlaps(item: np.ndarray, target: np.ndarray, row: int, col: int, item_id: int = 0) -> bool:
+    # brute force: an occupied item cell lands on a target cell held by something other than item_id
+    window = target[row:row + item.shape[0], col:col + item.shape[1]]
+    return bool(((item != 0) & (window != 0) & (window != item_id)).any())
+
+def random_reservation_map(rng: np.random.Generator, rows: int, cols: int, reservations: int) -> np.ndarray:
+    # reservations numbered from 1, each a random blob that may overlap the ones before
+    result = np.zeros((rows, cols), dtype=DISPLAY_NP_DATA_TYPE)
+    for reservation_no in range(1, reservations + 1):
+        height = int(rng.integers(1, rows // 2))
+        width = int(rng.integers(1, cols // 2))
+        row = int(rng.integers(0, rows - height))
+        col = int(rng.integers(0, cols - width))
+        blob = rng.random((height, width)) < 0.7
+        result[row:row + height, col:col + width][blob] = reservation_no
+    return result
+
+def random_item(rng: np.random.Generator, max_rows: int, max_cols: int) -> np.ndarray:
+    # a mask with holes, and now and then empty rows and cols at its edges
+    rows = int(rng.integers(1, max_rows))
+    cols = int(rng.integers(1, max_cols))
+    result = (rng.random((rows, cols)) < 0.6).astype(DISPLAY_NP_DATA_TYPE)
+    if 2 < rows and rng.random() < 0.3:
+        result[0, :] = 0
+    if 2 < cols and rng.random() < 0.3:
+        result[:, -1] = 0
+    return result
@@ -0,0 +1,114 @@
+import gc
+import numpy as np
+import pytest
+from itemcloud.box import Box
+from itemcloud.util.display_map import (
+    DISPLAY_NP_DATA_TYPE,
+    add_margin_to_display_map,
+    can_fit_on_target,
+    can_fit_runs_on_target,
+    create_occupancy_index,
+    from_displaymap_box,
+    from_displaymap_size,
+    g_display_map_runs,
+    g_margined_display_maps,
+    to_display_map_runs,
+    to_packed_display_map,
+    write_occupancy_index
+)
+from itemcloud.native.display_map import native_can_fit_on_packed_target
+from display_map_helpers import overlaps, random_item, random_reservation_map
+
+def to_occupancy_index(target: np.ndarray) -> np.ndarray:
+    result = create_occupancy_index(from_displaymap_size(target.shape))
+    write_occupancy_index(target, result, from_displaymap_box(target.shape))
+    return result
+
+def test_occupancy_index_sums_occupied_cells():
+    rng = np.random.default_rng(1)
+    target = random_reservation_map(rng, 37, 90, 8)
+    expected = np.zeros((38, 91), dtype=np.int64)
+    expected[1:, 1:] = np.cumsum(np.cumsum(target != 0, axis=0), axis=1)
+    assert np.array_equal(to_occupancy_index(target), expected)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_run_fits_match_brute_force(seed: int):
+    rng = np.random.default_rng(seed)
+    target = random_reservation_map(rng, 30, 80, 10)
+    occupancy_index = to_occupancy_index(target)
+    for _ in range(12):
+        item = random_item(rng, 14, 20)
+        item_id = int(rng.integers(0, 11))
+        for row in range(target.shape[0] - item.shape[0] + 1):
+            for col in range(target.shape[1] - item.shape[1] + 1):
+                box = Box(col, row, col + item.shape[1], row + item.shape[0])
+                expected = not(overlaps(item, target, row, col, item_id))
+                assert can_fit_on_target(item, target, box, item_id) == expected
+                assert can_fit_runs_on_target(item, target, occupancy_index, box, item_id) == expected
+
+@pytest.mark.parametrize('seed', range(4))
+def test_packed_fits_match_brute_force(seed: int):
+    # maps and items wider than a 64 bit word, so windows straddle words at every bit offset
+    rng = np.random.default_rng(seed)
+    target = random_reservation_map(rng, 24, 150, 12)
+    packed_target = to_packed_display_map(target)
+    for _ in range(8):
+        item = random_item(rng, 10, 80)
+        packed_item = to_packed_display_map(item)
+        for row in range(target.shape[0] - item.shape[0] + 1):
+            for col in range(target.shape[1] - item.shape[1] + 1):
+                expected = not(overlaps(item, target, row, col))
+                assert (0 != native_can_fit_on_packed_target(packed_item, packed_target, row, col)) == expected
+
+def brute_force_margin(item: np.ndarray, margin: int) -> np.ndarray:
+    # every cell within margin rows and cols of an occupied item cell, on a map margin cells bigger on every side
+    result = np.zeros((item.shape[0] + (margin * 2), item.shape[1] + (margin * 2)), dtype=bool)
+    for row, col in zip(*np.nonzero(item)):
+        result[row:row + (margin * 2) + 1, col:col + (margin * 2) + 1] = True
+    return result
+
+def brute_force_runs(item: np.ndarray) -> list[tuple[int, int, int]]:
+    result = list()
+    for row in range(item.shape[0]):
+        col = 0
+        while col < item.shape[1]:
+            if item[row, col] == 0:
+                col += 1
+                continue
+            first_col = col
+            while col < item.shape[1] and item[row, col] != 0:
+                col += 1
+            result.append((row, first_col, col - first_col))
+    return result
+
+def test_margined_maps_are_cached_until_the_item_is_freed():
+    rng = np.random.default_rng(3)
+    item = random_item(rng, 20, 30)
+    item_key = id(item)
+    margined = add_margin_to_display_map(item, 2)
+    assert np.array_equal(margined != 0, brute_force_margin(item, 2))
+    assert add_margin_to_display_map(item, 2) is margined
+    assert add_margin_to_display_map(item, 3) is not margined
+    del item
+    gc.collect()
+    assert item_key not in g_margined_display_maps
+
+def test_runs_are_cached_until_the_item_is_freed():
+    rng = np.random.default_rng(4)
+    item = random_item(rng, 20, 30)
+    item_key = id(item)
+    runs = to_display_map_runs(item)
+    assert [tuple(run) for run in runs.tolist()] == brute_force_runs(item)
+    assert to_display_map_runs(item) is runs
+    del item
+    gc.collect()
+    assert item_key not in g_display_map_runs
+
+def test_freed_items_do_not_leave_stale_caches():
+    # items of one shape, freed one after another, mostly reuse the same id
+    rng = np.random.default_rng(5)
+    for _ in range(50):
+        item = (rng.random((12, 17)) < 0.5).astype(DISPLAY_NP_DATA_TYPE)
+        assert np.array_equal(add_margin_to_display_map(item, 1) != 0, brute_force_margin(item, 1))
+        assert [tuple(run) for run in to_display_map_runs(item).tolist()] == brute_force_runs(item)
+        del item
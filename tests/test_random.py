@@ -0,0 +1,64 @@
+import os
+import pytest
+from itemcloud.containers.base.item_factory import load_weighted_item_row
+from itemcloud.item_cloud import ItemCloud
+from itemcloud.logger.base_logger import BaseLogger
+from itemcloud.size import Size, ResizeType
+from itemcloud.util.random import (
+    is_random_seeded,
+    next_random_seed,
+    random_in_range,
+    seed_random
+)
+from itemcloud.util.search_types import SearchPattern
+
+SAMPLE_IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples', 'images')
+
+@pytest.fixture(autouse=True)
+def unseeded():
+    yield
+    seed_random(None)
+
+def random_picks() -> tuple[list[int], int]:
+    return ([random_in_range(1000) for _ in range(20)], next_random_seed())
+
+def test_seed_replays_python_picks():
+    seed_random(42)
+    assert is_random_seeded()
+    picks = random_picks()
+    seed_random(42)
+    assert random_picks() == picks
+    seed_random(43)
+    assert random_picks() != picks
+    seed_random(None)
+    assert not(is_random_seeded())
+
+def generate(seed: int, total_threads: int, search_pattern: SearchPattern) -> list[tuple[str, str, int]]:
+    # 15 images crowded onto a small canvas, so items are shrunk and rotated to fit
+    items = [
+        load_weighted_item_row({'image_filepath': os.path.join(SAMPLE_IMAGES_DIR, name), 'weight': 1.0 / (index + 1), 'name': name})
+        for index, name in enumerate(sorted(os.listdir(SAMPLE_IMAGES_DIR)))
+    ]
+    item_cloud = ItemCloud(
+        logger=BaseLogger.create('test_random', False),
+        size=Size(300, 200),
+        min_item_size=Size(10, 10),
+        item_step=2,
+        resize_type=ResizeType.MAINTAIN_ASPECT_RATIO,
+        total_threads=total_threads,
+        search_pattern=search_pattern,
+        seed=seed
+    )
+    layout = item_cloud.generate(items)
+    return [(item.name, item.reservation_box.box_to_string(), item.rotated_degrees) for item in layout.items]
+
+@pytest.mark.parametrize('total_threads, search_pattern', [
+    (1, SearchPattern.NONE),
+    (2, SearchPattern.NONE),
+    (1, SearchPattern.RANDOM)
+])
+def test_seed_replays_layout(total_threads: int, search_pattern: SearchPattern):
+    placements = generate(5, total_threads, search_pattern)
+    assert any(0 != rotated_degrees for _, _, rotated_degrees in placements)
+    assert generate(5, total_threads, search_pattern) == placements
+    assert generate(6, total_threads, search_pattern) != placements
@@ -0,0 +1,419 @@
+import gc
+import math
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from itemcloud.box import Box, to_box_array
+from itemcloud.logger.base_logger import BaseLogger
+from itemcloud.reservations import (
+    OPENINGS_CACHE_CAPACITY,
+    NoFitFrontier,
+    Reservations,
+    gallop_to_last_fit,
+    to_native_openings_origins
+)
+from itemcloud.native.reservations import (
+    native_find_openings,
+    native_find_openings_in_area,
+    native_find_searched_opening,
+    native_find_spiral_opening
+)
+from itemcloud.util.display_map import DISPLAY_NP_DATA_TYPE, from_displaymap_size, to_packed_display_map
+from itemcloud.util.search import SearchProperties
+from itemcloud.util.search_types import RelativeDistance, RelativePosition, SearchPattern
+from display_map_helpers import overlaps, random_item, random_reservation_map
+
+def brute_force_origins(item: np.ndarray, target: np.ndarray) -> list[tuple[int, int]]:
+    # (row, col) of every upper left corner item fits at, in row-major order
+    return [
+        (row, col)
+        for row in range(target.shape[0] - item.shape[0] + 1)
+        for col in range(target.shape[1] - item.shape[1] + 1)
+        if not(overlaps(item, target, row, col))
+    ]
+
+def to_origins(native_openings) -> list[tuple[int, int]]:
+    rows, cols = to_native_openings_origins(native_openings)
+    return list(zip(rows.tolist(), cols.tolist()))
+
+def create_reservations(target: np.ndarray, tiled_reservation_map: bool = False) -> Reservations:
+    return Reservations.create_reservations(target.copy(), BaseLogger.create('test_reservations', False), tiled_reservation_map)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_find_openings_match_brute_force(seed: int):
+    # the occupancy index rejects or accepts whole blocks and the packed map tests the rest, in row-major order
+    rng = np.random.default_rng(seed)
+    target = random_reservation_map(rng, 60, 140, 14)
+    reservations = create_reservations(target)
+    native_reservations, position_buffer = reservations._scan_context()
+    for _ in range(6):
+        item = random_item(rng, 24, 70)
+        openings = native_find_openings(
+            native_reservations,
+            position_buffer,
+            reservations._reservation_map,
+            reservations._occupancy_index,
+            reservations._packed_reservation_map,
+            item,
+            to_packed_display_map(item)
+        )
+        assert to_origins(openings) == brute_force_origins(item, target)
+
+@pytest.mark.parametrize('seed', range(4))
+def test_find_openings_in_area_match_brute_force(seed: int):
+    rng = np.random.default_rng(seed)
+    target = random_reservation_map(rng, 60, 140, 14)
+    reservations = create_reservations(target)
+    native_reservations, position_buffer = reservations._scan_context()
+    for _ in range(6):
+        item = random_item(rng, 24, 70)
+        left = int(rng.integers(0, target.shape[1] - item.shape[1] + 1))
+        upper = int(rng.integers(0, target.shape[0] - item.shape[0] + 1))
+        area = Box(
+            left,
+            upper,
+            int(rng.integers(left + 1, target.shape[1] - item.shape[1] + 2)),
+            int(rng.integers(upper + 1, target.shape[0] - item.shape[0] + 2))
+        )
+        openings = native_find_openings_in_area(
+            native_reservations,
+            position_buffer,
+            reservations._reservation_map,
+            reservations._occupancy_index,
+            reservations._packed_reservation_map,
+            item,
+            to_packed_display_map(item),
+            area.to_native()
+        )
+        assert to_origins(openings) == [
+            (row, col)
+            for row, col in brute_force_origins(item, target)
+            if area.upper <= row < area.lower and area.left <= col < area.right
+        ]
+
+def relative_position(origin_x: int, origin_y: int, x: int, y: int) -> RelativePosition:
+    vertical = 'TOP' if y < origin_y else 'BOTTOM' if origin_y < y else None
+    horizontal = 'LEFT' if x < origin_x else 'RIGHT' if origin_x < x else None
+    return RelativePosition['_'.join(side for side in (vertical, horizontal) if side is not None) or 'RANDOM']
+
+def to_search_properties(area: Box, origin_x: int, origin_y: int, positions: list[RelativePosition], distance: RelativeDistance) -> SearchProperties:
+    return SearchProperties.from_native({
+        'area': area.to_native(),
+        'origin_x': origin_x,
+        'origin_y': origin_y,
+        'pattern': SearchPattern.LINEAR.value,
+        'loop': -1,
+        'positions': [position.value for position in positions] + [RelativePosition.NO_POSITION.value] * (3 - len(positions)),
+        'distance': distance.value
+    })
+
+def brute_force_searched_origins(item: np.ndarray, target: np.ndarray, search_properties: SearchProperties) -> list[tuple[int, int]]:
+    # (row, col) of the openings whose box centers are in the searched positions, best first and row-major on a tie
+    searched_origins = list()
+    for row, col in brute_force_origins(item, target):
+        x = col + (item.shape[1] // 2)
+        y = row + (item.shape[0] // 2)
+        if relative_position(search_properties.origin_x, search_properties.origin_y, x, y) in search_properties.positions:
+            distance_squared = ((x - search_properties.origin_x) ** 2) + ((y - search_properties.origin_y) ** 2)
+            searched_origins.append((distance_squared if RelativeDistance.CLOSEST == search_properties.distance else -distance_squared, row, col))
+    searched_origins.sort()
+    return [(row, col) for distance, row, col in searched_origins if distance == searched_origins[0][0]]
+
+def assert_searched_opening(reservations: Reservations, item: np.ndarray, search_properties: SearchProperties, expected_origins: list[tuple[int, int]]):
+    # find_searched_opening, and search over every opening, both take the first of the expected origins
+    native_reservations, position_buffer = reservations._scan_context()
+    packed_item = to_packed_display_map(item)
+    opening = native_find_searched_opening(
+        native_reservations,
+        reservations._occupancy_index,
+        reservations._packed_reservation_map,
+        item,
+        packed_item,
+        search_properties.to_native()
+    )
+    if 0 == len(expected_origins):
+        assert opening is None
+        return
+    row, col = expected_origins[0]
+    expected = Box(col, row, col + item.shape[1], row + item.shape[0])
+    assert Box.from_native(opening).equals(expected)
+    rows, cols = to_native_openings_origins(native_find_openings(
+        native_reservations,
+        position_buffer,
+        reservations._reservation_map,
+        reservations._occupancy_index,
+        reservations._packed_reservation_map,
+        item,
+        packed_item
+    ))
+    assert search_properties.search(to_box_array(cols, rows, from_displaymap_size(item.shape))).equals(expected)
+
+@pytest.mark.parametrize('distance', [RelativeDistance.CLOSEST, RelativeDistance.FARTHEST])
+@pytest.mark.parametrize('positions', [
+    [RelativePosition.TOP],
+    [RelativePosition.BOTTOM_LEFT, RelativePosition.LEFT, RelativePosition.TOP_LEFT],
+    [RelativePosition.RIGHT, RelativePosition.BOTTOM, RelativePosition.RANDOM]
+])
+def test_find_searched_opening_matches_brute_force(distance: RelativeDistance, positions: list[RelativePosition]):
+    rng = np.random.default_rng(len(positions) + distance.value)
+    target = random_reservation_map(rng, 60, 140, 6)
+    reservations = create_reservations(target)
+    for _ in range(12):
+        item = random_item(rng, 16, 40)
+        # origins on and past the map's edges, as patterns start from the area's edges
+        search_properties = to_search_properties(
+            reservations.reservation_area,
+            int(rng.integers(-10, target.shape[1] + 10)),
+            int(rng.integers(-10, target.shape[0] + 10)),
+            positions,
+            distance
+        )
+        assert_searched_opening(reservations, item, search_properties, brute_force_searched_origins(item, target, search_properties))
+
+@pytest.mark.parametrize('distance', [RelativeDistance.CLOSEST, RelativeDistance.FARTHEST])
+def test_find_searched_opening_breaks_ties_in_row_major_order(distance: RelativeDistance):
+    # a reserved block around the origin leaves openings mirrored about it, at every distance
+    target = np.zeros((41, 41), dtype=DISPLAY_NP_DATA_TYPE)
+    target[10:31, 10:31] = 1
+    item = np.ones((3, 3), dtype=DISPLAY_NP_DATA_TYPE)
+    search_properties = to_search_properties(Box(0, 0, 41, 41), 20, 20, [RelativePosition.TOP_LEFT, RelativePosition.TOP_RIGHT], distance)
+    expected_origins = brute_force_searched_origins(item, target, search_properties)
+    assert 1 < len(expected_origins)
+    assert_searched_opening(create_reservations(target), item, search_properties, expected_origins)
+
+@pytest.mark.parametrize('distance, free_cells', [
+    # a corner 5 rings out is farther than the side 6 rings out
+    (RelativeDistance.CLOSEST, [(15, 15), (14, 20)]),
+    # the side of the outer ring is nearer than a corner 1 ring in
+    (RelativeDistance.FARTHEST, [(0, 20), (1, 1)])
+])
+def test_find_searched_opening_searches_past_the_first_ring_found(distance: RelativeDistance, free_cells: list[tuple[int, int]]):
+    target = np.ones((41, 41), dtype=DISPLAY_NP_DATA_TYPE)
+    for row, col in free_cells:
+        target[row, col] = 0
+    item = np.ones((1, 1), dtype=DISPLAY_NP_DATA_TYPE)
+    search_properties = to_search_properties(Box(0, 0, 41, 41), 20, 20, [RelativePosition.TOP_LEFT, RelativePosition.TOP], distance)
+    expected_origins = brute_force_searched_origins(item, target, search_properties)
+    assert expected_origins == [free_cells[1]]
+    assert_searched_opening(create_reservations(target), item, search_properties, expected_origins)
+
+def spiral_angle(x: int, y: int, origin_x: int, origin_y: int) -> float:
+    # angle a spiral with turns a cell apart has turned through where it passes closest to x,y
+    dx = x - origin_x
+    dy = y - origin_y
+    direction = math.atan2(dy, dx)
+    if direction < 0:
+        direction = direction + (2 * math.pi)
+    turns = math.floor((((math.sqrt((dx * dx) + (dy * dy)) / (1 / (2 * math.pi))) - direction) / (2 * math.pi)) + 0.5)
+    return direction + (2 * math.pi * max(turns, 0))
+
+@pytest.mark.parametrize('seed', range(4))
+def test_find_spiral_opening_matches_brute_force(seed: int):
+    # the opening whose box center the spiral reaches at the least angle, the first in row-major order on a tie
+    rng = np.random.default_rng(seed)
+    target = random_reservation_map(rng, 60, 140, 14)
+    reservations = create_reservations(target)
+    native_reservations, _ = reservations._scan_context()
+    for _ in range(8):
+        item = random_item(rng, 24, 70)
+        left = int(rng.integers(0, target.shape[1]))
+        upper = int(rng.integers(0, target.shape[0]))
+        search_properties = SearchProperties.start(
+            Box(left, upper, int(rng.integers(left + 1, target.shape[1] + 1)), int(rng.integers(upper + 1, target.shape[0] + 1))),
+            SearchPattern.ARCHIMEDEAN
+        )
+        opening = native_find_spiral_opening(
+            native_reservations,
+            reservations._occupancy_index,
+            reservations._packed_reservation_map,
+            item,
+            to_packed_display_map(item),
+            search_properties.to_native()
+        )
+        origins = brute_force_origins(item, target)
+        if 0 == len(origins):
+            assert opening is None
+            continue
+        row, col = min(origins, key=lambda origin: (
+            spiral_angle(origin[1] + (item.shape[1] // 2), origin[0] + (item.shape[0] // 2), search_properties.origin_x, search_properties.origin_y),
+            origin
+        ))
+        assert Box.from_native(opening).equals(Box(col, row, col + item.shape[1], row + item.shape[0]))
+
+@pytest.mark.parametrize('item_shape', ['shaped', 'solid', 'large'])
+def test_find_unreserved_openings_match_brute_force(item_shape: str):
+    # whichever of the scan, the free rectangles or the correlation answers for the party
+    rng = np.random.default_rng(7)
+    target = random_reservation_map(rng, 200, 320, 6)
+    match item_shape:
+        case 'shaped':
+            item = random_item(rng, 30, 40)
+        case 'solid':
+            item = np.zeros((21, 33), dtype=DISPLAY_NP_DATA_TYPE)
+            item[2:, 1:-3] = 1
+        case 'large':
+            item = np.ones((130, 130), dtype=DISPLAY_NP_DATA_TYPE)
+            item[40:90, 40:90] = 0
+    openings = create_reservations(target)._find_unreserved_openings(item)
+    assert sorted(zip(openings['upper'].tolist(), openings['left'].tolist())) == brute_force_origins(item, target)
+
+def test_cached_openings_follow_later_reservations():
+    # cached origins are rescanned around each later reservation, on a copy of the origins other threads may hold
+    rng = np.random.default_rng(9)
+    target = random_reservation_map(rng, 120, 200, 4)
+    reservations = create_reservations(target)
+    item = random_item(rng, 20, 30)
+    for reservation_no in range(5, 10):
+        openings = reservations._find_unreserved_openings(item)
+        assert sorted(zip(openings['upper'].tolist(), openings['left'].tolist())) == brute_force_origins(item, reservations._reservation_map)
+        published_origins = reservations._openings_cache[id(item)].origins
+        unchanged_origins = published_origins.copy()
+        party_map = random_item(rng, 12, 16)
+        row = int(rng.integers(0, target.shape[0] - party_map.shape[0] + 1))
+        col = int(rng.integers(0, target.shape[1] - party_map.shape[1] + 1))
+        opening = Box(col, row, col + party_map.shape[1], row + party_map.shape[0])
+        assert reservations.reserve_opening('party', reservation_no, opening, SimpleNamespace(display_map=party_map), 0)
+        reservations._find_unreserved_openings(item)
+        assert np.array_equal(published_origins, unchanged_origins)
+
+def test_cached_openings_keep_one_finalizer_per_party():
+    rng = np.random.default_rng(10)
+    reservations = create_reservations(random_reservation_map(rng, 60, 100, 4))
+    items = [random_item(rng, 10, 10) for _ in range(OPENINGS_CACHE_CAPACITY + 1)]
+    reservations._find_unreserved_openings(items[0])
+    finalizer = reservations._openings_cache[id(items[0])].finalizer
+    reservations._find_unreserved_openings(items[0])
+    assert reservations._openings_cache[id(items[0])].finalizer is finalizer
+    # evicting the least recently used party detaches its finalizer, and caching it again registers one
+    for item in items[1:]:
+        reservations._find_unreserved_openings(item)
+    assert id(items[0]) not in reservations._openings_cache
+    assert not(finalizer.alive)
+    reservations._find_unreserved_openings(items[0])
+    assert reservations._openings_cache[id(items[0])].finalizer.alive
+    item_key = id(items[0])
+    del items[0]
+    gc.collect()
+    assert item_key not in reservations._openings_cache
+
+@pytest.mark.parametrize('seed', range(3))
+def test_tiled_fits_match_brute_force(seed: int):
+    # a map spanning several 64x64 tiles, so windows straddle tiles
+    rng = np.random.default_rng(seed)
+    target = random_reservation_map(rng, 150, 200, 10)
+    reservations = create_reservations(target, True)
+    for _ in range(200):
+        item = random_item(rng, 70, 90)
+        item_id = int(rng.integers(0, 11))
+        row = int(rng.integers(0, target.shape[0] - item.shape[0] + 1))
+        col = int(rng.integers(0, target.shape[1] - item.shape[1] + 1))
+        box = Box(col, row, col + item.shape[1], row + item.shape[0])
+        assert reservations._can_fit_on_reservation_map(item, box, item_id) == (not(overlaps(item, target, row, col, item_id)))
+
+@pytest.mark.parametrize('seed', range(4))
+def test_free_cell_counts_only_reject_parties_that_fit_nowhere(seed: int):
+    # on a map filled up a reservation at a time, with parties now and then taller than the map
+    rng = np.random.default_rng(seed)
+    reservations = create_reservations(random_reservation_map(rng, 40, 90, 3))
+    checks = list()
+    for reservation_no in range(10, 30):
+        reservation_map = reservations._reservation_map
+        assert np.array_equal(reservations._free_row_counts, np.count_nonzero(reservation_map == 0, axis=1))
+        assert reservations._free_total == np.count_nonzero(reservation_map == 0)
+        for _ in range(6):
+            item = random_item(rng, 46, 60)
+            has_free_cells = reservations._has_free_cells_for(item)
+            checks.append(has_free_cells)
+            assert has_free_cells or 0 == len(brute_force_origins(item, reservation_map))
+        party_map = random_item(rng, 20, 40)
+        row = int(rng.integers(0, reservation_map.shape[0] - party_map.shape[0] + 1))
+        col = int(rng.integers(0, reservation_map.shape[1] - party_map.shape[1] + 1))
+        opening = Box(col, row, col + party_map.shape[1], row + party_map.shape[0])
+        assert reservations.reserve_opening('party', reservation_no, opening, SimpleNamespace(display_map=party_map), 0)
+    assert True in checks and False in checks
+    assert not(reservations._has_free_cells_for(np.ones((41, 1), dtype=DISPLAY_NP_DATA_TYPE)))
+
+def test_free_cell_counts_accept_a_party_filling_every_free_cell():
+    rng = np.random.default_rng(11)
+    item = random_item(rng, 20, 30)
+    item[0, 0] = 1
+    target = np.ones((40, 90), dtype=DISPLAY_NP_DATA_TYPE)
+    target[5:5 + item.shape[0], 7:7 + item.shape[1]][item != 0] = 0
+    assert create_reservations(target)._has_free_cells_for(item)
+
+def test_no_fit_frontier_excludes_sizes_a_miss_covers():
+    # against every miss added, while only the misses no other is narrower and shorter than are kept
+    rng = np.random.default_rng(12)
+    frontier = NoFitFrontier()
+    misses: list[tuple[int, int]] = list()
+    for _ in range(40):
+        misses.append((int(rng.integers(1, 30)), int(rng.integers(1, 30))))
+        frontier.add(*misses[-1])
+        for width in range(1, 32):
+            for height in range(1, 32):
+                assert frontier.excludes(width, height) == any(
+                    miss_width <= width and miss_height <= height for miss_width, miss_height in misses
+                )
+    assert not(any(
+        kept != other and kept[0] <= other[0] and kept[1] <= other[1]
+        for kept in frontier._failed_sizes
+        for other in frontier._failed_sizes
+    ))
+
+def test_only_solid_misses_rule_out_parties(monkeypatch: pytest.MonkeyPatch):
+    # two free strips 6 cells wide: rows have the free cells for a 7 wide party, but never 7 together
+    target = np.ones((40, 60), dtype=DISPLAY_NP_DATA_TYPE)
+    target[5:35, 10:16] = 0
+    target[5:35, 30:36] = 0
+    reservations = create_reservations(target)
+    search_properties = SearchProperties.start(reservations.reservation_area, SearchPattern.NONE)
+    shaped = np.ones((7, 7), dtype=DISPLAY_NP_DATA_TYPE)
+    shaped[:, 3] = 0
+    assert reservations._find_unreserved_opening(shaped, search_properties) is None
+    assert reservations._no_fit_frontier._failed_sizes == []
+    assert reservations._find_unreserved_opening(np.ones((7, 7), dtype=DISPLAY_NP_DATA_TYPE), search_properties) is None
+    assert reservations._no_fit_frontier._failed_sizes == [(7, 7)]
+    # a shaped party holding a solid 7x7 box is ruled out without a search, a smaller solid party is still placed
+    covering = np.ones((9, 8), dtype=DISPLAY_NP_DATA_TYPE)
+    covering[0, 0] = 0
+    assert 0 == len(brute_force_origins(covering, target))
+    with monkeypatch.context() as patched:
+        patched.setattr(reservations, '_search_unreserved_opening', lambda item, search_properties: pytest.fail('searched'))
+        assert reservations._find_unreserved_opening(covering, search_properties) is None
+    opening = reservations._find_unreserved_opening(np.ones((6, 6), dtype=DISPLAY_NP_DATA_TYPE), search_properties)
+    assert opening is not None and not(overlaps(np.ones((6, 6)), target, opening.upper, opening.left))
+
+def fits_below(edge: int, tried: list[int]):
+    # fits up to edge, keeping each distance tried
+    def fits(distance: int) -> bool:
+        tried.append(distance)
+        return distance <= edge
+    return fits
+
+@pytest.mark.parametrize('edge', [0, 1, 2, 3, 4, 5, 7, 8, 9, 63, 64, 65, 1000])
+def test_gallop_to_last_fit_finds_the_edge(edge: int):
+    tried: list[int] = list()
+    assert gallop_to_last_fit(fits_below(edge, tried)) == edge
+    assert 0 not in tried
+    # doubling out and bisecting back, not stepping
+    assert len(tried) <= 2 * (edge.bit_length() + 1)
+
+def test_gallop_to_last_fit_tries_1_first():
+    tried: list[int] = list()
+    assert gallop_to_last_fit(fits_below(0, tried)) == 0
+    assert tried == [1]
+
+@pytest.mark.parametrize('edge, limit', [
+    (10, 0), (0, 5), (10, 1), (10, 4), (10, 6), (10, 10), (10, 11), (10, 16), (16, 16), (17, 16), (1000, 300)
+])
+def test_gallop_to_last_fit_stops_at_the_limit(edge: int, limit: int):
+    tried: list[int] = list()
+    assert gallop_to_last_fit(fits_below(edge, tried), limit) == min(edge, limit)
+    assert all(1 <= distance <= limit for distance in tried)
+
+def test_gallop_to_last_fit_returns_a_tried_fit():
+    # fitting need not stop once: a hole at 3 is jumped, but what is returned was tried and fits
+    tried: list[int] = list()
+    fits = lambda distance: tried.append(distance) or distance not in (3, 9) and distance <= 12
+    result = gallop_to_last_fit(fits)
+    assert result in tried and fits(result)
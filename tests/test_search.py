@@ -0,0 +1,15 @@
+import numpy as np
+import pytest
+from itemcloud.box import Box, to_box_array
+from itemcloud.size import Size
+from itemcloud.util.search import SearchProperties
+from itemcloud.util.search_types import SearchPattern
+
+@pytest.mark.parametrize('search_pattern', list(SearchPattern))
+def test_search_rejects_no_boxes(search_pattern: SearchPattern):
+    search_properties = SearchProperties.start(Box(0, 0, 100, 60), search_pattern)
+    boxes = to_box_array(np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp), Size(5, 5))
+    with pytest.raises(ValueError):
+        search_properties.search(boxes)
+    with pytest.raises(ValueError):
+        search_properties.pick(boxes)